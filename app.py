@@ -17,15 +17,16 @@ import logic
 from datetime import datetime
 
 from components.dbtoItem import _db_row_to_item
+from components.resultIndex import get_result_index
 from ui import render_main_search_page
-from components.mainSearchPage import render_main_search_page
+from components.mainSearchPage import STREAM_PREVIEW_MAX_CARDS, render_main_search_page, render_streaming_preview
 
 # -----------------------------------------------------------------------------
 # Config
 # -----------------------------------------------------------------------------
 st.set_page_config(page_title="Facebook Ads Extractor", layout="wide")
 ui.inject_global_css()
-logic.init_db()
+logic.ensure_db()  # schema/migrations run once per process, not on every rerun
 
 # -----------------------------------------------------------------------------
 # Professional Dark Theme Styling
@@ -544,6 +545,38 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+def _build_search_url(search_mode: str, user_input: str, country_code: str, ad_type_param: str, active_status_param: str) -> str:
+    """Build the Ad Library URL for one search term in the given UI search mode."""
+    if search_mode == "Page ID Search":
+        # For page ID search, we use fixed parameters as per the exact format
+        return logic.build_fb_ads_library_url(
+            country="ALL",  # Always use ALL for page ID search
+            page_id=user_input,
+            ad_type="all",  # Always use all for page ID search
+            active_status="all",  # Always use all for page ID search
+            search_mode="page_id",
+        )
+    if search_mode == "Landing Page Domain Search":
+        # For landing domain search, we use fixed parameters as per the exact format
+        return logic.build_fb_ads_library_url(
+            country=country_code,  # Use user-selected country
+            landing_domain=user_input,
+            ad_type="all",  # Always use all for landing domain search
+            active_status="active",  # Always use active for landing domain search
+            search_mode="landing_domain",
+        )
+    return logic.build_fb_ads_library_url(
+        country=country_code,
+        keyword=user_input,
+        ad_type=ad_type_param,
+        active_status=active_status_param,
+        search_mode="keyword_unordered",
+    )
+
+
 # -----------------------------------------------------------------------------
 # Mode Selector
 # -----------------------------------------------------------------------------
@@ -593,26 +626,59 @@ if mode == "Search Ads":
         
         st.markdown('<div class="dynamic-form">', unsafe_allow_html=True)
         
+        # Batch mode fans the same query out over several countries / terms
+        batch_mode = st.checkbox(
+            "🧺 Batch mode (multiple countries or terms)",
+            value=False,
+            key="search_batch_mode",
+            help="Run one scrape per country × term concurrently and merge the results by ad ID",
+        )
+        
         # Common parameters - First row
         col1, col2 = st.columns(2)
         
         with col1:
             # Country selector
             country_labels = [n for n, _ in logic.COMMON_COUNTRIES] + ["Custom…"]
-            country_label_sel = st.selectbox("🌍 Country", options=country_labels, index=0, key="search_country_sel")
-            if country_label_sel == "Custom…":
-                country_code = st.text_input("ISO country code", value="", key="search_country_custom").strip().upper() or "US"
-                country_label = country_code
+            if batch_mode and st.session_state["search_mode"] != "Page ID Search":
+                batch_country_labels = st.multiselect(
+                    "🌍 Countries",
+                    options=[n for n, _ in logic.COMMON_COUNTRIES],
+                    default=[logic.COMMON_COUNTRIES[0][0]],
+                    key="search_country_multi",
+                )
+                batch_country_codes = [dict(logic.COMMON_COUNTRIES)[n] for n in batch_country_labels]
+                country_code = batch_country_codes[0] if batch_country_codes else "US"
+                country_label = ", ".join(batch_country_labels) or country_code
             else:
-                country_code = dict(logic.COMMON_COUNTRIES)[country_label_sel]
-                country_label = country_label_sel
+                country_label_sel = st.selectbox("🌍 Country", options=country_labels, index=0, key="search_country_sel")
+                if country_label_sel == "Custom…":
+                    country_code = st.text_input("ISO country code", value="", key="search_country_custom").strip().upper() or "US"
+                    country_label = country_code
+                else:
+                    country_code = dict(logic.COMMON_COUNTRIES)[country_label_sel]
+                    country_label = country_label_sel
+                batch_country_codes = [country_code]
         
         with col2:
             # Number of ads
             count = st.number_input("📊 Number of Ads", min_value=1, max_value=1000, value=10, step=1, key="search_count")
         
         # Search type specific inputs - Second row
-        if st.session_state["search_mode"] == "Keyword Search":
+        if batch_mode:
+            batch_term_labels = {
+                "Keyword Search": "🔍 Keywords",
+                "Page ID Search": "📄 Page IDs",
+                "Landing Page Domain Search": "🌐 Domains",
+            }
+            user_input = st.text_area(
+                batch_term_labels[st.session_state["search_mode"]],
+                placeholder="One per line or comma separated",
+                key="search_batch_terms_input",
+            )
+            st.markdown('<div class="info-box">💡 Every term is searched in every selected country; duplicate ads are merged</div>', unsafe_allow_html=True)
+            
+        elif st.session_state["search_mode"] == "Keyword Search":
             user_input = st.text_input("🔍 Keyword", placeholder="Enter keyword (e.g. auto insurance)", key="search_keyword_input")
             st.markdown('<div class="info-box">💡 Enter keywords to search for ads containing specific terms</div>', unsafe_allow_html=True)
             
@@ -647,6 +713,13 @@ if mode == "Search Ads":
             )
             active_status_param = logic.ACTIVE_STATUS_LABEL_TO_PARAM[active_status_label]
         
+        stream_results = not batch_mode and st.checkbox(
+            "⚡ Stream results as they arrive",
+            value=True,
+            key="search_stream_results",
+            help="Show ads page by page while the scrape is still running instead of waiting for the full result set",
+        )
+        
         # Search button - Fourth row
         st.markdown('<div class="button-container">', unsafe_allow_html=True)
         fetch_clicked = st.button("🚀 Start Search", type="primary", key="search_fetch_btn", use_container_width=True)
@@ -667,38 +740,31 @@ if mode == "Search Ads":
                 st.error("❌ Apify API token not configured. Please set APIFY_TOKEN in your environment variables or Streamlit secrets.")
                 st.stop()
 
-            # Build correct URL based on search mode
-            if st.session_state["search_mode"] == "Keyword Search":
-                url = logic.build_fb_ads_library_url(
-                    country=country_code,
-                    keyword=user_input,
-                    ad_type=ad_type_param,
-                    active_status=active_status_param,
-                    search_mode="keyword_unordered",
-                )
-            elif st.session_state["search_mode"] == "Page ID Search":
-                # For page ID search, we use fixed parameters as per the exact format
-                url = logic.build_fb_ads_library_url(
-                    country="ALL",  # Always use ALL for page ID search
-                    page_id=user_input,
-                    ad_type="all",  # Always use all for page ID search
-                    active_status="all",  # Always use all for page ID search
-                    search_mode="page_id",
-                )
-            elif st.session_state["search_mode"] == "Landing Page Domain Search":
-                # For landing domain search, we use fixed parameters as per the exact format
-                url = logic.build_fb_ads_library_url(
-                    country=country_code,  # Use user-selected country
-                    landing_domain=user_input,
-                    ad_type="all",  # Always use all for landing domain search
-                    active_status="active",  # Always use active for landing domain search
-                    search_mode="landing_domain",
-                )
-            else:
+            # Build correct URL(s) based on search mode
+            if st.session_state["search_mode"] not in ("Keyword Search", "Page ID Search", "Landing Page Domain Search"):
                 st.error("❌ Unknown search mode selected.")
                 st.stop()
 
-            st.session_state["last_query_url"] = url
+            if batch_mode:
+                batch_terms = logic.split_batch_terms(user_input)
+                if not batch_terms:
+                    st.error("❌ Please enter at least one search term (one per line or comma-separated)!")
+                    st.stop()
+                if st.session_state["search_mode"] == "Page ID Search":
+                    batch_country_codes = ["ALL"]
+                if not batch_country_codes:
+                    st.error("❌ Please select at least one country!")
+                    st.stop()
+                batch_urls = [
+                    _build_search_url(st.session_state["search_mode"], term, cc, ad_type_param, active_status_param)
+                    for term in batch_terms
+                    for cc in batch_country_codes
+                ]
+                url = batch_urls[0]
+            else:
+                url = _build_search_url(st.session_state["search_mode"], user_input, country_code, ad_type_param, active_status_param)
+
+            st.session_state["last_query_url"] = batch_urls if batch_mode else url
             st.session_state["last_query_params"] = {
                 "country_code": country_code,
                 "country_label": country_label,
@@ -707,6 +773,7 @@ if mode == "Search Ads":
                 "active_status_param": active_status_param,
                 "count": count,
                 "search_mode": st.session_state["search_mode"],
+                "batch_mode": batch_mode,
             }
             
             # Debug: Show the request format being sent
@@ -724,20 +791,81 @@ if mode == "Search Ads":
             }
             st.session_state["last_request_format"] = request_format
 
-            with st.spinner(f"🔍 Running Apify scrape for {count} ads…"):
+            cached_items = logic.scrape_cache_get(url, int(count), active_status_param) if stream_results else None
+            if batch_mode:
+                with st.spinner(f"🔍 Running {len(batch_urls)} Apify scrapes concurrently ({count} ads each)…"):
+                    try:
+                        items, batch_errors, batch_partial = logic.run_apify_batch(
+                            apify_token,
+                            batch_urls,
+                            int(count),
+                            active_status_param,
+                        )
+                    except Exception as e:
+                        st.error(f"❌ Apify batch scrape failed: {e}")
+                        st.stop()
+                for failed_url, err in batch_errors.items():
+                    st.warning(f"⚠️ Scrape failed for {failed_url}: {err}")
+                for partial_url, run_status in batch_partial.items():
+                    st.warning(f"⚠️ Partial result for {partial_url}: the Apify run ended with status {run_status} (not cached)")
+            elif cached_items is not None:
+                items = cached_items
+            elif stream_results:
+                # Streaming mode: render each dataset page as soon as Apify has it. The
+                # whole result is still kept (filters, sorts and exports need it); the
+                # preview only shows the latest cards so it doesn't grow with the result
+                progress_slot = st.empty()
+                preview_slot = st.empty()
+                items = []
+                run_status = None
+                progress_slot.markdown(f'<div class="results-summary">🔍 Starting Apify scrape for {count} ads…</div>', unsafe_allow_html=True)
                 try:
-                    items = logic.run_apify_scrape(
+                    pages = logic.iter_apify_scrape_pages(
                         apify_token,
                         url,
                         int(count),
                         active_status_param,
                     )
+                    while True:
+                        try:
+                            page = next(pages)
+                        except StopIteration as done:
+                            # The generator returns the run's final status
+                            run_status = done.value
+                            break
+                        items.extend(page)
+                        progress_slot.markdown(f'<div class="results-summary">⏳ Received {len(items)} of {count} ads…</div>', unsafe_allow_html=True)
+                        start_idx = max(0, len(items) - STREAM_PREVIEW_MAX_CARDS)
+                        with preview_slot.container():
+                            render_streaming_preview(items[start_idx:], start_idx=start_idx)
                 except Exception as e:
                     st.error(f"❌ Apify scrape failed: {e}")
                     st.stop()
-
+                progress_slot.empty()
+                preview_slot.empty()
+                # Only complete results are cached; a failed or timed-out run keeps what it streamed
+                if run_status == "SUCCEEDED" and items:
+                    logic.scrape_cache_put(url, int(count), active_status_param, items)
+                elif items:
+                    st.warning(f"⚠️ The Apify run ended with status {run_status}; showing the {len(items)} ads it returned before stopping (not cached).")
+            else:
+                with st.spinner(f"🔍 Running Apify scrape for {count} ads…"):
+                    try:
+                        items = logic.run_apify_scrape(
+                            apify_token,
+                            url,
+                            int(count),
+                            active_status_param,
+                        )
+                    except Exception as e:
+                        st.error(f"❌ Apify scrape failed: {e}")
+                        st.stop()
+
+            # Normalize and index once at ingestion; cards, filters, sorts and exports reuse them
+            get_result_index(items)
             st.session_state["ads_items"] = items
             st.session_state["search_timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            st.session_state.pop("last_refresh_report", None)
             st.session_state.pop("selected_ad_idx", None)
             st.session_state.pop("save_pending_idx", None)
             
@@ -761,6 +889,42 @@ if mode == "Search Ads":
     params = st.session_state.get("last_query_params")
     ads_items = st.session_state.get("ads_items", [])
 
+    # Delta refresh of the last single-URL search
+    refresh_url = st.session_state.get("last_query_url")
+    if ads_items and params and not params.get("batch_mode") and isinstance(refresh_url, str):
+        if st.button("🔄 Refresh (new & changed ads only)", key="search_refresh_btn", help="Re-run the last search and download only ads that are new or changed since it was ingested"):
+            apify_token = logic.resolve_apify_token()
+            if not apify_token:
+                st.error("❌ Apify API token not configured. Please set APIFY_TOKEN in your environment variables or Streamlit secrets.")
+                st.stop()
+            with st.spinner("🔄 Refreshing search…"):
+                try:
+                    ads_items, refresh_report = logic.refresh_apify_scrape(
+                        apify_token,
+                        refresh_url,
+                        int(params["count"]),
+                        params["active_status_param"],
+                        base_items=ads_items,
+                    )
+                except Exception as e:
+                    st.error(f"❌ Refresh failed: {e}")
+                    st.stop()
+            get_result_index(ads_items)
+            st.session_state["ads_items"] = ads_items
+            st.session_state["search_timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            st.session_state["last_refresh_report"] = refresh_report
+            st.session_state.pop("selected_ad_idx", None)
+            st.session_state.pop("save_pending_idx", None)
+
+        refresh_report = st.session_state.get("last_refresh_report")
+        if refresh_report:
+            st.markdown(
+                f'<div class="results-summary">🔄 Refreshed: {len(refresh_report["added"])} new, '
+                f'{len(refresh_report["removed"])} removed, {len(refresh_report["status_changed"])} changed status '
+                f'({refresh_report["full_items_fetched"]} of {refresh_report["total"]} ads downloaded in full)</div>',
+                unsafe_allow_html=True,
+            )
+
     if ads_items:
         render_main_search_page(ads_items, params, card_image_key="original_image_url")
 
@@ -886,8 +1050,7 @@ else:
     st.markdown('</div>', unsafe_allow_html=True)
     
     if team_choice and team_choice != "(choose)":
-        rows = logic.db_fetch_team(team_choice)
-        ui.render_saved_ads_page(team_choice, rows)
+        ui.render_saved_team_page(team_choice)
     else:
         st.info("💾 Select a team from the dropdown to view saved ads, or create a new team using the 'Add Team' button.")
 
@@ -905,7 +1068,7 @@ with st.expander("🔧 Debug Info"):
         st.json(st.session_state.get("last_request_format"))
     
     # Add test buttons
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
         if st.button("🔍 Test Database"):
             logic.test_delete_functionality()
@@ -918,3 +1081,8 @@ with st.expander("🔧 Debug Info"):
     with col4:
         if st.button("🌐 Test Landing Domain Request"):
             logic.test_landing_domain_request_format()
+    with col5:
+        if st.button("🧹 Clear Scrape Cache"):
+            logic.scrape_cache_clear()
+            logic.run_apify_scrape.clear()
+            st.success("Scrape cache cleared")
@@ -8,9 +8,10 @@ from typing import Dict, Any
 
 from components.siderbar import render_sidebar_search, render_sidebar_saved_mode, _card_save_ui
 from components.dbtoItem import _db_row_to_item, _make_detail_table_html
+from components.adRecord import get_ad_record
 
 def render_ad_detail(item: Dict[str, Any]):
-    f = logic.extract_selected_fields(item)
+    f = get_ad_record(item).as_fields()
 
     page_name = f.get("page_name") or "(no page name)"
     ad_archive_id = f.get("ad_archive_id") or "–"
@@ -0,0 +1,231 @@
+from __future__ import annotations
+import html
+from typing import Optional, List, Dict, Any, Callable, Sequence
+
+import streamlit as st
+import streamlit.components.v1 as components
+from components.adCard import AD_CARD_CSS, AD_CARD_SCRIPT, build_ad_card_markup, card_media
+from components.adRecord import get_ad_record
+from components.thumbnail_utils import THUMB_WAIT_SECONDS, thumbnail_url, warm_thumbnails
+
+# Cards per page offered by paginated grids
+GRID_PAGE_SIZE_OPTIONS = (12, 24, 48, 96)
+GRID_DEFAULT_PAGE_SIZE = 24
+
+# Labels of the pager buttons; the keyboard handler clicks buttons by label
+PAGER_PREV_LABEL = "◀ Previous"
+PAGER_NEXT_LABEL = "Next ▶"
+
+# Grid geometry (px); a row is as tall as the single-card frame's card
+GRID_ROW_HEIGHT = 430
+GRID_GAP = 24
+GRID_FRAME_MARGIN = 8
+
+# Vertical gap Streamlit leaves between stacked elements (1rem); the per-row action
+# blocks beside the grid subtract it so they stay level with their row of cards
+STREAMLIT_BLOCK_GAP = 16
+
+# Where a card sits in its grid row, as shown next to its controls
+ROW_POSITION_LABELS = {2: ("Left", "Right"), 3: ("Left", "Middle", "Right")}
+
+GRID_CSS = f"""
+    body {{
+        margin: {GRID_FRAME_MARGIN}px;
+    }}
+    .ad-grid {{
+        display: grid;
+        grid-auto-rows: {GRID_ROW_HEIGHT}px;
+        gap: {GRID_GAP}px;
+    }}
+    .ad-grid .ad-card {{
+        min-height: 0;
+    }}
+    .ad-grid-frame .ad-modal-content {{
+        margin: 0 auto;
+        max-height: 900px;
+    }}
+"""
+
+
+def grid_frame_height(n_cards: int, cols_per_row: int = 3) -> int:
+    """Iframe height needed to show n_cards without an inner scrollbar."""
+    rows = max(1, -(-n_cards // cols_per_row))
+    return rows * GRID_ROW_HEIGHT + (rows - 1) * GRID_GAP + 2 * GRID_FRAME_MARGIN
+
+
+def grid_image_urls(items: List[Dict[str, Any]], image_url_key: Optional[str] = None) -> List[str]:
+    """The image URLs cards for `items` display (videos excluded)."""
+    urls = []
+    for item in items:
+        media_type, media_url = card_media(item, item.get(image_url_key) if image_url_key else None)
+        if media_type != "video" and media_url:
+            urls.append(media_url)
+    return urls
+
+
+def build_ad_grid_html(
+    items: List[Dict[str, Any]],
+    *,
+    start_idx: int = 0,
+    cols_per_row: int = 3,
+    image_url_key: Optional[str] = None,
+    prefetch_urls: Sequence[str] = (),
+) -> str:
+    """
+    Markup for a whole page of ad cards: one stylesheet, one script, all cards and modals.
+
+    Cards are numbered from start_idx + 1 (the numbers bulk selections list).
+    prefetch_urls (e.g. the next page's images) are added as <link rel="prefetch">
+    hints so the browser warms its cache while idle, and their thumbnails start
+    generating in the background.
+
+    Images are shown from the local thumbnail store; the page waits up to
+    THUMB_WAIT_SECONDS for missing thumbnails and uses the originals for any still pending.
+    """
+    warm_thumbnails(prefetch_urls)
+    warm_thumbnails(grid_image_urls(items, image_url_key), wait=THUMB_WAIT_SECONDS)
+
+    cards, modals = [], []
+    for i, item in enumerate(items):
+        card_html, modal_html = build_ad_card_markup(
+            item,
+            start_idx + i,
+            image_url=item.get(image_url_key) if image_url_key else None,
+        )
+        cards.append(card_html)
+        modals.append(modal_html)
+
+    hints = "".join(
+        f'<link rel="prefetch" href="{html.escape(thumbnail_url(u, "card") or u, quote=True)}">'
+        for u in prefetch_urls
+        if u and u.startswith(("http://", "https://"))
+    )
+    return (
+        f"{hints}<style>{AD_CARD_CSS}{GRID_CSS}</style>"
+        f"<div class='ad-grid-frame'>"
+        f"<div class='ad-grid' style='grid-template-columns: repeat({cols_per_row}, minmax(0, 1fr));'>"
+        f"{''.join(cards)}</div>{''.join(modals)}</div>"
+        f"<script>{AD_CARD_SCRIPT}</script>"
+    )
+
+
+def render_ad_grid(
+    items: List[Dict[str, Any]],
+    *,
+    start_idx: int = 0,
+    cols_per_row: int = 3,
+    image_url_key: Optional[str] = None,
+    card_actions: Callable[[int, Dict[str, Any]], None],
+) -> None:
+    """
+    Render a page of ad cards as a single component (one iframe for the whole grid),
+    with card_actions(idx, item) drawing each card's controls beside it.
+    """
+    if not items:
+        return
+    render_grid_with_actions(
+        build_ad_grid_html(items, start_idx=start_idx, cols_per_row=cols_per_row, image_url_key=image_url_key),
+        items,
+        start_idx=start_idx,
+        cols_per_row=cols_per_row,
+        card_actions=card_actions,
+    )
+
+
+def render_grid_html(grid_html: str, n_cards: int, cols_per_row: int = 3) -> None:
+    """Render markup from build_ad_grid_html (e.g. a cached page) as one component."""
+    components.html(grid_html, height=grid_frame_height(n_cards, cols_per_row))
+
+
+def render_grid_with_actions(
+    grid_html: str,
+    items: List[Dict[str, Any]],
+    *,
+    start_idx: int = 0,
+    cols_per_row: int = 3,
+    card_actions: Callable[[int, Dict[str, Any]], None],
+) -> None:
+    """
+    Render markup from build_ad_grid_html as one component, with a column of Streamlit
+    controls beside it: one block per grid row, level with that row, holding
+    card_actions(idx, item) for each of its cards (labelled by position and page name).
+    """
+    positions = ROW_POSITION_LABELS.get(cols_per_row)
+    grid_col, actions_col = st.columns([cols_per_row, 1], gap="small")
+    with grid_col:
+        render_grid_html(grid_html, len(items), cols_per_row)
+    with actions_col:
+        for row_start in range(0, len(items), cols_per_row):
+            with st.container(height=GRID_ROW_HEIGHT + GRID_GAP - STREAMLIT_BLOCK_GAP, border=False):
+                for i, item in enumerate(items[row_start:row_start + cols_per_row]):
+                    position = positions[i] if positions else f"Card {i + 1}"
+                    st.caption(f"**{position}** · {get_ad_record(item).page_name or '(no page name)'}")
+                    card_actions(start_idx + row_start + i, item)
+
+
+def page_count(n_items: int, page_size: int) -> int:
+    return max(1, -(-n_items // page_size))
+
+
+def render_page_nav(page_key: str, n_items: int, page_size: int) -> None:
+    """
+    Previous / page indicator / Next controls for an offset-paginated grid.
+
+    The current page (0-based) lives in st.session_state[page_key].
+    """
+    pages = page_count(n_items, page_size)
+    page = min(st.session_state.get(page_key, 0), pages - 1)
+    if pages <= 1:
+        return
+    nav_prev, nav_label, nav_next = st.columns([1, 2, 1])
+    with nav_prev:
+        if st.button(PAGER_PREV_LABEL, key=f"{page_key}_prev", disabled=page == 0, use_container_width=True):
+            st.session_state[page_key] = page - 1
+            st.rerun()
+    with nav_label:
+        first = page * page_size + 1
+        last = min((page + 1) * page_size, n_items)
+        st.markdown(
+            f"<div style='text-align:center;padding-top:0.4rem;'>Page {page + 1} of {pages} "
+            f"· ads {first}–{last} of {n_items} · use ← / → to move</div>",
+            unsafe_allow_html=True,
+        )
+    with nav_next:
+        if st.button(PAGER_NEXT_LABEL, key=f"{page_key}_next", disabled=page >= pages - 1, use_container_width=True):
+            st.session_state[page_key] = page + 1
+            st.rerun()
+
+
+def enable_pager_keyboard() -> None:
+    """
+    Let ← / → trigger the pager buttons from anywhere on the page (outside text inputs).
+
+    The handler is installed on the parent Streamlit document and replaced on every run.
+    """
+    components.html(
+        f"""
+        <script>
+        (function () {{
+            const doc = window.parent.document;
+            if (doc.__adPagerHandler) doc.removeEventListener('keydown', doc.__adPagerHandler);
+            doc.__adPagerHandler = function (event) {{
+                const el = event.target;
+                const tag = (el.tagName || '').toLowerCase();
+                if (tag === 'input' || tag === 'textarea' || tag === 'select' || el.isContentEditable) return;
+                if (event.altKey || event.ctrlKey || event.metaKey) return;
+                const label = event.key === 'ArrowRight' ? {PAGER_NEXT_LABEL!r}
+                    : event.key === 'ArrowLeft' ? {PAGER_PREV_LABEL!r} : null;
+                if (!label) return;
+                const btn = Array.from(doc.querySelectorAll('button'))
+                    .find(b => b.innerText.trim() === label && !b.disabled);
+                if (btn) {{
+                    event.preventDefault();
+                    btn.click();
+                }}
+            }};
+            doc.addEventListener('keydown', doc.__adPagerHandler);
+        }})();
+        </script>
+        """,
+        height=0,
+    )
@@ -0,0 +1,127 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any
+
+import logic
+from components.download_utils import format_ad_dates
+
+# Curated columns, in the same order extract_selected_fields returns them
+CURATED_FIELDS = (
+    "ad_archive_id", "categories", "collation_count", "collation_id",
+    "start_date", "end_date", "entity_type", "is_active",
+    "page_id", "page_name", "cta_text", "cta_type",
+    "link_url", "page_entity_type", "page_profile_picture_url",
+    "page_profile_uri", "state_media_run_label", "total_active_time",
+    "original_image_url",
+)
+
+# Values derived once per ad for cards, detail view, filters and exports
+DERIVED_FIELDS = (
+    "ad_text", "status", "active", "running_days",
+    "start_date_display", "end_date_display", "active_days",
+    "media_type", "media_url", "brand_initial",
+)
+
+# Upper bound on memoized records (LRU by ad_archive_id)
+AD_RECORD_MEMO_SIZE = 5000
+
+
+class AdRecord:
+    """
+    Normalized, precomputed view of one raw Apify item.
+
+    Built once per item by build_ad_record; every derived value the UI needs
+    (curated fields, status, running days, formatted dates, best media) is filled in.
+    """
+    __slots__ = ("raw",) + CURATED_FIELDS + DERIVED_FIELDS
+
+    def __init__(self, raw: Dict[str, Any], **values: Any):
+        self.raw = raw
+        for name in CURATED_FIELDS + DERIVED_FIELDS:
+            setattr(self, name, values.get(name))
+
+    def as_fields(self) -> Dict[str, Any]:
+        """Curated field dict, identical to logic.extract_selected_fields(raw)."""
+        f = {name: getattr(self, name) for name in CURATED_FIELDS}
+        f["original_picture_url"] = self.original_image_url  # backward compat
+        return f
+
+    def __repr__(self) -> str:
+        return f"AdRecord(ad_archive_id={self.ad_archive_id!r}, page_name={self.page_name!r}, status={self.status!r})"
+
+
+def build_ad_record(item: Dict[str, Any]) -> AdRecord:
+    """Compute an AdRecord from a raw item in a single pass (snapshot parsed once per helper call)."""
+    f = logic.extract_selected_fields(item)
+
+    # --- Ensure Active is always boolean ---
+    active_val = item.get("Active", f.get("is_active"))
+    if isinstance(active_val, str):
+        active = active_val.lower() == "true"
+    else:
+        active = bool(active_val)
+
+    date_info = format_ad_dates(item)
+    media_type, media_url = logic.extract_best_media(item, fields=f)
+    page_name = f.get("page_name") or item.get("pageName") or item.get("Page_Name")
+
+    values = {name: f.get(name) for name in CURATED_FIELDS}
+    values.update(
+        ad_text=item.get("adText") or item.get("ad_text") or item.get("text") or "",
+        status=logic.detect_status(item),
+        active=active,
+        running_days=logic.compute_running_days(item),
+        start_date_display=date_info["start_date"],
+        end_date_display=date_info["end_date"],
+        active_days=date_info["active_days"],
+        media_type=media_type,
+        media_url=media_url,
+        brand_initial=page_name[0].upper() if page_name else "?",
+    )
+    return AdRecord(item, **values)
+
+
+_memo: "OrderedDict[str, AdRecord]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def get_ad_record(item: Dict[str, Any]) -> AdRecord:
+    """
+    Return the memoized AdRecord for an item, building it on first use.
+
+    Records are keyed by ad_archive_id; a cached record is reused only when it was
+    built from the same item (or an equal one), so refreshed data is never served stale.
+    """
+    ad_id = item.get("ad_archive_id") or item.get("adId")
+    if not ad_id:
+        return build_ad_record(item)
+    key = str(ad_id)
+
+    with _memo_lock:
+        rec = _memo.get(key)
+        if rec is not None and (rec.raw is item or rec.raw == item):
+            _memo.move_to_end(key)
+            return rec
+
+    rec = build_ad_record(item)
+    with _memo_lock:
+        _memo[key] = rec
+        _memo.move_to_end(key)
+        while len(_memo) > AD_RECORD_MEMO_SIZE:
+            _memo.popitem(last=False)
+    return rec
+
+
+def normalize_items(items: List[Dict[str, Any]]) -> List[AdRecord]:
+    """Ingestion hook: build (or refresh) the record for every item in a result set."""
+    return [get_ad_record(it) for it in items]
+
+
+def clear_ad_records(ad_archive_id: Optional[str] = None) -> None:
+    """Drop one memoized record, or all of them."""
+    with _memo_lock:
+        if ad_archive_id is None:
+            _memo.clear()
+        else:
+            _memo.pop(str(ad_archive_id), None)
@@ -0,0 +1,168 @@
+from __future__ import annotations
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Tuple, List
+
+import pandas as pd
+
+# Formats accepted by parse_date, in the order logic.parse_date_maybe always tried them.
+# They are mutually exclusive, so trying them in a different order never changes the result.
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+)
+
+# Formats format_date accepts for display (no timezone offsets)
+DISPLAY_DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+# Shapes where datetime.fromisoformat gives exactly what strptime would for the formats above
+_ISO_PLAIN_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}(?:[T ][0-9]{2}:[0-9]{2}:[0-9]{2})?")
+_ISO_OFFSET_RE = re.compile(
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}(?:\.[0-9]{1,6})?(?:Z|[+-][0-9]{2}:?[0-9]{2})"
+)
+
+# Distinct values remembered by parse_date (ads repeat the same dates a lot)
+DATE_CACHE_SIZE = 65536
+
+
+def _iso_shape(s: str) -> Optional[str]:
+    """The DATE_FORMATS entry `s` is shaped like, when fromisoformat can stand in for it."""
+    if _ISO_PLAIN_RE.fullmatch(s):
+        if len(s) == 10:
+            return "%Y-%m-%d"
+        return "%Y-%m-%dT%H:%M:%S" if s[10] == "T" else "%Y-%m-%d %H:%M:%S"
+    if _ISO_OFFSET_RE.fullmatch(s):
+        return "%Y-%m-%dT%H:%M:%S.%f%z" if "." in s else "%Y-%m-%dT%H:%M:%S%z"
+    return None
+
+
+def parse_date_string(
+    s: str,
+    formats: Sequence[str] = DATE_FORMATS,
+    hint: Optional[str] = None,
+) -> Tuple[Optional[datetime], Optional[str]]:
+    """
+    Parse a date string against `formats`, trying datetime.fromisoformat first.
+
+    Args:
+        s: The string to parse
+        formats: strptime formats the string may be in
+        hint: A format that matched a previous value from the same source; tried first
+
+    Returns:
+        (datetime or None, the format that matched or None)
+    """
+    fmt = _iso_shape(s)
+    if fmt is not None and fmt in formats:
+        try:
+            return datetime.fromisoformat(s), fmt
+        except ValueError:  # invalid day/month, or a 'Z' suffix on older Pythons
+            pass
+
+    if hint in formats:
+        try:
+            return datetime.strptime(s, hint), hint
+        except ValueError:
+            pass
+    for fmt in formats:
+        if fmt == hint:
+            continue
+        try:
+            return datetime.strptime(s, fmt), fmt
+        except ValueError:
+            continue
+    return None, None
+
+
+def _parse_epoch(s: str) -> Optional[datetime]:
+    try:
+        if s.isdigit():
+            return datetime.fromtimestamp(int(s), tz=timezone.utc)
+    except Exception:  # noqa: BLE001
+        pass
+    return None
+
+
+def _parse_date_uncached(value: Any, hint: Optional[str] = None) -> Tuple[Optional[datetime], Optional[str]]:
+    if not value:
+        return None, None
+    s = str(value)
+    dt, fmt = parse_date_string(s, DATE_FORMATS, hint)
+    if dt is not None:
+        return dt, fmt
+    return _parse_epoch(s), None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE, typed=True)
+def _parse_date_cached(value: Any) -> Optional[datetime]:
+    return _parse_date_uncached(value)[0]
+
+
+def parse_date(value: Any) -> Optional[datetime]:
+    """
+    Parse a date string or epoch into a datetime (None if it can't be parsed).
+
+    Date-only and plain ISO strings come back naive; offset strings and epochs come back
+    timezone-aware, matching the behaviour parse_date_maybe always had. Results are cached
+    per distinct input value.
+    """
+    try:
+        return _parse_date_cached(value)
+    except TypeError:  # unhashable input
+        return _parse_date_uncached(value)[0]
+
+
+def parse_dates(values: Any) -> Any:
+    """
+    Batch version of parse_date for a list or a pandas Series.
+
+    Each distinct value is parsed once, and the format detected on the first string is
+    tried first for the rest of the column.
+
+    Returns:
+        A list of datetimes/None, or an object Series aligned with the input Series
+    """
+    if isinstance(values, pd.Series):
+        return pd.Series(parse_dates(values.tolist()), index=values.index, dtype=object)
+
+    seen: dict = {}
+    hint: Optional[str] = None
+    out: List[Optional[datetime]] = []
+    for v in values:
+        try:
+            out.append(seen[(type(v), v)])
+            continue
+        except KeyError:
+            pass
+        except TypeError:  # unhashable
+            out.append(_parse_date_uncached(v, hint)[0])
+            continue
+        dt, fmt = _parse_date_uncached(v, hint)
+        if fmt is not None:
+            hint = fmt
+        seen[(type(v), v)] = dt
+        out.append(dt)
+    return out
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_display_date(s: str) -> Optional[datetime]:
+    """Parse a string in one of DISPLAY_DATE_FORMATS (naive datetime), or None. Cached."""
+    return parse_date_string(s, DISPLAY_DATE_FORMATS)[0]
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_day_date(s: str) -> Optional[datetime]:
+    """Parse a strict YYYY-MM-DD string (naive datetime), or None. Cached."""
+    return parse_date_string(s, ("%Y-%m-%d",))[0]
+
+
+def clear_date_cache() -> None:
+    """Drop all cached parse results."""
+    _parse_date_cached.cache_clear()
+    parse_display_date.cache_clear()
+    parse_day_date.cache_clear()
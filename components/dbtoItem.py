@@ -1,8 +1,114 @@
 import streamlit as st
 import logic
 import json
+import hashlib
+import threading
 import streamlit.components.v1 as components
 import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from components.adRecord import get_ad_record
+
+# Decoded raw_json items kept per ad_archive_id, bounded by the size of their decoded JSON text
+RAW_ITEM_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# ad_archive_id -> (version, decoded size, item); version is the row's raw_version
+_raw_items: "OrderedDict[str, Tuple[Any, int, Dict[str, Any]]]" = OrderedDict()
+_raw_items_bytes = 0
+_raw_items_lock = threading.Lock()
+
+
+def _raw_json_digest(raw_json: Any) -> bytes:
+    data = raw_json.encode("utf-8") if isinstance(raw_json, str) else bytes(raw_json)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _cached_raw_item(ad_id: str, version: Any) -> Optional[Dict[str, Any]]:
+    """Cached decoded item, only if it was decoded from that version of the stored raw_json."""
+    if version is None:
+        return None
+    with _raw_items_lock:
+        entry = _raw_items.get(ad_id)
+        if entry is None or entry[0] != version:
+            return None
+        _raw_items.move_to_end(ad_id)
+        return entry[2]
+
+
+def rehydrate_raw_item(ad_id: Any, raw_json: Any, version: Any = None) -> Optional[Dict[str, Any]]:
+    """
+    Decode a stored raw_json into the original item, once per ad and version.
+
+    `version` is the row's raw_version (bumped whenever a re-save changes raw_json);
+    without one, a digest of the stored bytes is used instead.
+
+    Decoded items are shared between callers (and keep AdRecord memo hits cheap),
+    so treat them as read-only.
+    """
+    if raw_json is None or isinstance(raw_json, dict):
+        return raw_json
+    if not ad_id:
+        return logic.decode_raw_json(raw_json)
+    key = str(ad_id)
+    if version is None:
+        version = _raw_json_digest(raw_json)
+    item = _cached_raw_item(key, version)
+    if item is not None:
+        return item
+    # Charged by the decoded JSON text: stored BLOBs are compressed, the dicts are not
+    item, size = logic.decode_raw_json_sized(raw_json)
+    if item is None:
+        return None
+
+    global _raw_items_bytes
+    with _raw_items_lock:
+        old = _raw_items.pop(key, None)
+        if old is not None:
+            _raw_items_bytes -= old[1]
+        _raw_items[key] = (version, size, item)
+        _raw_items_bytes += size
+        while _raw_items_bytes > RAW_ITEM_CACHE_MAX_BYTES and len(_raw_items) > 1:
+            _, (_version, evicted, _item) = _raw_items.popitem(last=False)
+            _raw_items_bytes -= evicted
+    return item
+
+
+def load_raw_items(rows: Iterable[dict]) -> Dict[str, Dict[str, Any]]:
+    """
+    Original items for saved-ad rows, keyed by ad_archive_id: decoded from the row's
+    raw_json, from the cache, or (for the rest) with one DB query.
+
+    Rows carry raw_version, so an item cached before the ad was re-saved (and its
+    raw_json refreshed) isn't reused.
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    for row in rows:
+        ad_id = str(row.get("ad_archive_id") or "")
+        if not ad_id or ad_id in out:
+            continue
+        if "raw_json" in row:
+            item = rehydrate_raw_item(ad_id, row["raw_json"], row.get("raw_version"))
+        else:
+            item = _cached_raw_item(ad_id, row.get("raw_version"))
+        if item is not None:
+            out[ad_id] = item
+        elif "raw_json" not in row:
+            missing.append(ad_id)
+    if missing:
+        for ad_id, (raw_json, version) in logic.db_fetch_raw_json(missing).items():
+            item = rehydrate_raw_item(ad_id, raw_json, version)
+            if item is not None:
+                out[ad_id] = item
+    return out
+
+
+def clear_raw_items() -> None:
+    global _raw_items_bytes
+    with _raw_items_lock:
+        _raw_items.clear()
+        _raw_items_bytes = 0
+
 
 def _make_detail_table_html(rows):
     cells = []
@@ -11,13 +117,28 @@ def _make_detail_table_html(rows):
         cells.append(f"<tr><td>{label}</td><td>{val}</td></tr>")
     return f"<table class='fb-detail-table'>{''.join(cells)}</table>"
 
-def _db_row_to_item(row: dict) -> dict:
+def _needs_raw_item(row: dict) -> bool:
+    """Card rows (no raw_json column) whose creative can't be resolved from the curated columns."""
+    return "raw_json" not in row and not row.get("original_image_url")
+
+
+def _db_row_to_item(row: dict, full: bool = False) -> dict:
     """
     Convert DB row -> item-like dict for extract_selected_fields/media helpers.
-    Uses raw_json if stored; otherwise constructs minimal snapshot.
+
+    Uses the stored raw item when the row carries raw_json (decoded once per ad and
+    cached), when it was already decoded, or, with full=True, loaded on demand for rows
+    that omit it. Otherwise constructs a minimal snapshot from the curated columns.
     """
-    if isinstance(row.get("raw_json"), dict):
-        return row["raw_json"]
+    ad_id = row.get("ad_archive_id")
+    if "raw_json" in row:
+        item = rehydrate_raw_item(ad_id, row["raw_json"], row.get("raw_version"))
+    elif full:
+        item = load_raw_items([row]).get(str(ad_id))
+    else:
+        item = _cached_raw_item(str(ad_id), row.get("raw_version")) if ad_id else None
+    if item is not None:
+        return item
 
     snap = {
         "link_url": row.get("link_url"),
@@ -52,9 +173,18 @@ def _db_row_to_item(row: dict) -> dict:
         "snapshot": snap,
     }
     
+def db_rows_to_items(rows: List[dict]) -> List[dict]:
+    """
+    _db_row_to_item for a page of card rows; raw items are loaded (in one query) only
+    for the ads whose media needs them.
+    """
+    load_raw_items(r for r in rows if _needs_raw_item(r))
+    return [_db_row_to_item(r) for r in rows]
+
+
 def render_saved_ad_detail(db_row: dict):
-    item_like = _db_row_to_item(db_row)
-    f = logic.extract_selected_fields(item_like)
+    item_like = _db_row_to_item(db_row, full=True)
+    f = get_ad_record(item_like).as_fields()
 
     page_name = f.get("page_name") or "(no page name)"
     ad_archive_id = f.get("ad_archive_id") or "–"
@@ -108,8 +238,8 @@ def render_saved_ad_detail(db_row: dict):
         ]
         st.markdown(_make_detail_table_html(info_rows), unsafe_allow_html=True)
 
-    raw = db_row.get("raw_json")
-    if isinstance(raw, dict):
+    raw = load_raw_items([db_row]).get(str(db_row.get("ad_archive_id")))
+    if raw is not None:
         with st.expander("All fields (raw JSON from DB)"):
             st.json(raw)
     else:
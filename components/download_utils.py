@@ -1,8 +1,6 @@
 from __future__ import annotations
 import streamlit as st
-import requests
 from datetime import datetime, timezone
-import base64
 from io import BytesIO
 from PIL import Image
 import os
@@ -10,6 +8,12 @@ from urllib.parse import urlparse
 import mimetypes
 from typing import Optional, Tuple, Any
 
+from components.date_utils import parse_day_date, parse_display_date
+from components.media_utils import fetch_media, is_fetchable, media_content_type
+
+# Seconds a download click waits for media that was not prefetched yet
+MEDIA_CLICK_TIMEOUT = 30
+
 # Date formatting functions
 def format_date(ts: Any) -> str:
     """Convert Unix timestamp to readable date"""
@@ -20,12 +24,9 @@ def format_date(ts: Any) -> str:
     if isinstance(ts, str):
         try:
             # Try to parse as datetime string
-            for fmt in ("%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"):
-                try:
-                    dt = datetime.strptime(ts, fmt)
-                    return dt.strftime("%Y-%m-%d")
-                except ValueError:
-                    continue
+            dt = parse_display_date(ts)
+            if dt is not None:
+                return dt.strftime("%Y-%m-%d")
             # If it's a numeric string, treat as timestamp
             if ts.replace('.', '').replace('-', '').isdigit():
                 ts = float(ts)
@@ -55,16 +56,16 @@ def calculate_days(start_ts: Any, end_ts: Any) -> int:
     
     # Handle string dates
     if isinstance(start_ts, str):
-        try:
-            start_ts = datetime.strptime(start_ts, "%Y-%m-%d").timestamp()
-        except:
+        parsed = parse_day_date(start_ts)
+        if parsed is None:
             return 0
+        start_ts = parsed.timestamp()
     
     if isinstance(end_ts, str):
-        try:
-            end_ts = datetime.strptime(end_ts, "%Y-%m-%d").timestamp()
-        except:
+        parsed = parse_day_date(end_ts)
+        if parsed is None:
             return 0
+        end_ts = parsed.timestamp()
     
     # Handle numeric timestamps
     if isinstance(start_ts, (int, float)) and isinstance(end_ts, (int, float)):
@@ -96,40 +97,32 @@ def get_file_extension_from_url(url: str) -> str:
     if ext:
         return ext.lower()
     
-    # Fallback: guess from content type
-    try:
-        response = requests.head(url, timeout=10)
-        content_type = response.headers.get('content-type', '')
-        ext = mimetypes.guess_extension(content_type.split(';')[0])
-        return ext if ext else '.jpg'  # default fallback
-    except:
-        return '.jpg'  # default fallback
+    # Fallback: guess from content type (cached bytes, or a HEAD on the shared media pool)
+    content_type = media_content_type(url)
+    ext = mimetypes.guess_extension(content_type) if content_type else None
+    return ext if ext else '.jpg'  # default fallback
 
 def download_media_file(url: str, filename: Optional[str] = None) -> Tuple[Optional[bytes], Optional[str]]:
     """Download media file from URL and return bytes"""
     if not url or url == "N/A":
         return None, None
     
-    try:
-        # Add headers to ensure proper download
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, timeout=30, headers=headers)
-        response.raise_for_status()
-        
-        if not filename:
-            # Generate filename from URL or use default
-            parsed_url = urlparse(url)
-            filename = os.path.basename(parsed_url.path)
-            if not filename or '.' not in filename:
-                ext = get_file_extension_from_url(url)
-                filename = f"facebook_ad_media{ext}"
-        
-        return response.content, filename
-    except requests.RequestException as e:
-        st.error(f"Error downloading media: {str(e)}")
+    # Served from the prefetch cache when the page already warmed it; otherwise fetched
+    # over the shared keep-alive pool (timeouts and retries live in media_utils)
+    blob = fetch_media(url)
+    if blob is None:
+        st.error("Error downloading media: the file could not be fetched")
         return None, None
+    
+    if not filename:
+        # Generate filename from URL or use default
+        parsed_url = urlparse(url)
+        filename = os.path.basename(parsed_url.path)
+        if not filename or '.' not in filename:
+            ext = get_file_extension_from_url(url)
+            filename = f"facebook_ad_media{ext}"
+    
+    return blob.data, filename
 
 def get_proper_mime_type(file_data: bytes, filename: str) -> str:
     """Get proper MIME type for file download"""
@@ -184,8 +177,26 @@ def create_download_button(media_url: str, ad_id: str, media_type: str = "image"
             else:
                 st.error(f"Failed to download {media_type}")
 
+def media_download_button(media_url: str, ad_id: str, media_type: str = "image", key: Optional[str] = None) -> None:
+    """One-click download of ad media, served from local bytes (the visible page is prefetched)"""
+    if not is_fetchable(media_url):
+        return
+    blob = fetch_media(media_url, timeout=MEDIA_CLICK_TIMEOUT)
+    if blob is None:
+        st.caption(f"⚠️ {media_type.title()} is not available for download")
+        return
+    filename = f"facebook_ad_{ad_id}_{media_type}{get_file_extension_from_url(media_url)}"
+    st.download_button(
+        label=f"📥 Download {media_type.title()}",
+        data=blob.data,
+        file_name=filename,
+        mime=get_proper_mime_type(blob.data, filename),
+        key=key or f"media_download_{ad_id}_{media_type}",
+        use_container_width=True
+    )
+
 def create_force_download_button(media_url: str, ad_id: str, media_type: str = "image") -> None:
-    """Create download button that forces download using base64 encoding"""
+    """Create download button that forces download (octet-stream, bytes served by Streamlit)"""
     if not media_url or media_url == "N/A":
         st.warning("No media URL available for download")
         return
@@ -200,29 +211,15 @@ def create_force_download_button(media_url: str, ad_id: str, media_type: str = "
             file_data, actual_filename = download_media_file(media_url, filename)
             
             if file_data:
-                # Convert to base64 for guaranteed download
-                b64_data = base64.b64encode(file_data).decode()
-                
-                # Create HTML download link that forces download
-                href = f'data:application/octet-stream;base64,{b64_data}'
-                
-                st.markdown(f'''
-                <a href="{href}" download="{actual_filename}">
-                    <button style="
-                        background-color: #4CAF50;
-                        color: white;
-                        padding: 10px 20px;
-                        border: none;
-                        border-radius: 5px;
-                        cursor: pointer;
-                        font-size: 16px;
-                        width: 100%;
-                        margin-top: 10px;
-                    ">
-                        💾 Click to Save {actual_filename}
-                    </button>
-                </a>
-                ''', unsafe_allow_html=True)
+                # Streamlit serves the bytes from its media endpoint; no base64 copy in the page
+                st.download_button(
+                    label=f"💾 Click to Save {actual_filename}",
+                    data=file_data,
+                    file_name=actual_filename,
+                    mime="application/octet-stream",
+                    key=f"force_save_{ad_id}_{media_type}",
+                    use_container_width=True
+                )
                 
                 st.success(f"{media_type.title()} ready for download! Click the button above to save.")
             else:
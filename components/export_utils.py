@@ -0,0 +1,146 @@
+from __future__ import annotations
+import io
+import importlib.util
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+import streamlit as st
+
+import logic
+
+# Result sets whose built exports are kept (the current search plus the previous one)
+EXPORT_CACHE_SIZE = 2
+# Exports are written to their buffer in pieces of about this many characters / rows
+EXPORT_CHUNK_CHARS = 1 << 16
+EXPORT_CHUNK_ROWS = 5000
+
+# Parquet needs pyarrow (or fastparquet); the button is hidden without one
+PARQUET_AVAILABLE = any(importlib.util.find_spec(m) is not None for m in ("pyarrow", "fastparquet"))
+
+
+def _write_chunked(buf: io.BytesIO, pieces) -> None:
+    """Encode an iterable of str pieces into `buf`, batching small pieces together."""
+    pending: List[str] = []
+    size = 0
+    for piece in pieces:
+        pending.append(piece)
+        size += len(piece)
+        if size >= EXPORT_CHUNK_CHARS:
+            buf.write("".join(pending).encode("utf-8"))
+            pending, size = [], 0
+    if pending:
+        buf.write("".join(pending).encode("utf-8"))
+
+
+def export_json(items: List[Dict[str, Any]]) -> bytes:
+    """Pretty-printed JSON array (same bytes as json.dumps(items, indent=2, ensure_ascii=False))."""
+    buf = io.BytesIO()
+    _write_chunked(buf, json.JSONEncoder(indent=2, ensure_ascii=False).iterencode(items))
+    return buf.getvalue()
+
+
+def export_ndjson(items: List[Dict[str, Any]]) -> bytes:
+    """One compact JSON object per line."""
+    buf = io.BytesIO()
+    _write_chunked(buf, (json.dumps(it, ensure_ascii=False, separators=(",", ":")) + "\n" for it in items))
+    return buf.getvalue()
+
+
+def export_csv(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding="utf-8", chunksize=EXPORT_CHUNK_ROWS)
+    return buf.getvalue()
+
+
+def export_parquet(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    try:
+        df.to_parquet(buf, index=False)
+    except (TypeError, ValueError):  # a column mixes types the engine can't infer one type for
+        buf = io.BytesIO()
+        df.astype("string").to_parquet(buf, index=False)
+    return buf.getvalue()
+
+
+class ExportCache:
+    """
+    Built export payloads for one result set, generated on first request.
+
+    Builders run on Streamlit's download thread, so everything is guarded by a lock;
+    the curated DataFrame is built once and shared by the CSV and Parquet exports.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]], fingerprint: str):
+        self.items = items
+        self.fingerprint = fingerprint
+        self._payloads: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name: str, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            if name not in self._payloads:
+                self._payloads[name] = build()
+            return self._payloads[name]
+
+    def dataframe(self) -> pd.DataFrame:
+        return self._get("df", lambda: logic.ads_to_dataframe(self.items))
+
+    def json(self) -> bytes:
+        return self._get("json", lambda: export_json(self.items))
+
+    def ndjson(self) -> bytes:
+        return self._get("ndjson", lambda: export_ndjson(self.items))
+
+    def csv(self) -> bytes:
+        return self._get("csv", lambda: export_csv(self.dataframe()))
+
+    def parquet(self) -> bytes:
+        return self._get("parquet", lambda: export_parquet(self.dataframe()))
+
+
+_cache: "OrderedDict[str, ExportCache]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_export_cache(items: List[Dict[str, Any]], fingerprint: Optional[str] = None) -> ExportCache:
+    """
+    Return the export cache for a result set (keyed by result_fingerprint).
+
+    Like the result index, an entry is reused only for the same list object, so a
+    refresh that keeps the ids but changes the data gets fresh exports.
+    """
+    fingerprint = fingerprint or logic.result_fingerprint(items)
+    with _cache_lock:
+        cache = _cache.get(fingerprint)
+        if cache is None or cache.items is not items:
+            cache = ExportCache(items, fingerprint)
+            _cache[fingerprint] = cache
+        _cache.move_to_end(fingerprint)
+        while len(_cache) > EXPORT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return cache
+
+
+def lazy_download_button(label: str, build: Callable[[], Any], *, key: str, **kwargs: Any) -> None:
+    """
+    Download button whose contents are generated only when it is clicked.
+
+    Streamlit versions that accept a callable for `data` build the file on click with no
+    rerun. Older versions get a "Prepare" button first, and the file is built on that rerun.
+    """
+    try:
+        st.download_button(label, data=build, key=key, on_click="ignore", **kwargs)
+        return
+    except (TypeError, RuntimeError, st.errors.StreamlitAPIException):  # no callable data / on_click
+        pass
+
+    ready_key = f"{key}_ready"
+    if not st.session_state.get(ready_key):
+        if st.button(f"⏳ Prepare {label}", key=f"{key}_prepare", use_container_width=kwargs.get("use_container_width", False)):
+            st.session_state[ready_key] = True
+        else:
+            return
+    st.download_button(label, data=build(), key=f"{key}_file", **kwargs)
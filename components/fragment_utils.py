@@ -0,0 +1,31 @@
+from __future__ import annotations
+from typing import Callable, TypeVar
+
+import streamlit as st
+
+F = TypeVar("F", bound=Callable)
+
+# st.fragment (>= 1.37) or st.experimental_fragment (1.33-1.36); None on older versions
+_st_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+
+def fragment(func: F) -> F:
+    """
+    Run `func` as a Streamlit fragment: widget interactions inside it rerun only that
+    function, not the whole app. On Streamlit versions without fragments this is a no-op
+    and interactions fall back to full reruns.
+    """
+    if _st_fragment is None:
+        return func
+    return _st_fragment(func)
+
+
+def rerun_fragment() -> None:
+    """Rerun just the current fragment (whole app where fragments are unavailable)."""
+    if _st_fragment is not None:
+        try:
+            st.rerun(scope="fragment")
+            return
+        except TypeError:  # st.rerun() without a scope argument
+            pass
+    st.rerun()
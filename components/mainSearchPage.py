@@ -1,9 +1,134 @@
 from __future__ import annotations
 import streamlit as st
-import json
 import logic
 from typing import Optional, List, Dict, Any
-from components.adCard import render_ad_card
+from components.adCard import _card_save_controls, render_ad_card
+from components.adGrid import (
+    GRID_DEFAULT_PAGE_SIZE,
+    GRID_PAGE_SIZE_OPTIONS,
+    build_ad_grid_html,
+    enable_pager_keyboard,
+    grid_image_urls,
+    page_count,
+    render_grid_with_actions,
+    render_page_nav,
+)
+from components.adRecord import get_ad_record, normalize_items
+from components.fragment_utils import fragment
+from components.resultIndex import SORT_OPTIONS, STATUS_OPTIONS, get_result_index
+from components.export_utils import PARQUET_AVAILABLE, get_export_cache, lazy_download_button
+from components.download_utils import media_download_button
+from components.media_utils import prefetch_media
+from components.zip_utils import build_media_zip
+
+# Built grid pages kept per session (the current page and the ones visited just before)
+GRID_HTML_CACHE_PAGES = 3
+
+# Cards the streaming preview shows at most (the latest ones received)
+STREAM_PREVIEW_MAX_CARDS = 48
+
+
+def _summary_report(ads_items, records, result_index, params, generated) -> str:
+    """Text analysis report for the Summary Report download."""
+    active_ads = result_index.active_count
+    inactive_ads = len(ads_items) - active_ads
+    # Calculate percentages safely
+    active_percent = round(active_ads/len(ads_items)*100, 1) if ads_items else 0
+    inactive_percent = round(inactive_ads/len(ads_items)*100, 1) if ads_items else 0
+    
+    summary_text = f"""Facebook Ad Campaign Analysis Report
+Generated: {generated}
+Search Parameters: {params if params else 'N/A'}
+
+EXECUTIVE SUMMARY
+================
+Total Unique Ads Analyzed: {len(ads_items)}
+Active Campaigns: {active_ads} ({active_percent}%)
+Inactive Campaigns: {inactive_ads} ({inactive_percent}%)
+
+PLATFORM DISTRIBUTION
+====================
+Facebook: {len(ads_items)} ads (100%)
+"""
+    summary_text += f"""
+
+TOP PERFORMING METRICS
+=====================
+Most Common Platform: Facebook
+Longest Running Campaign: {max([rec.running_days for rec in records if rec.running_days], default=0)} days
+
+CAMPAIGN CATEGORIES
+==================
+"""
+    categories = result_index.category_counts()
+    for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True)[:10]:
+        summary_text += f"{cat}: {count} campaigns\n"
+    return summary_text
+
+
+def render_streaming_preview(page_items: List[Dict[str, Any]], start_idx: int = 0, cols_per_row: int = 3):
+    """
+    Render lightweight, widget-free cards while a streaming scrape is running.
+    The full interactive grid replaces this preview once all pages have arrived.
+    """
+    for row_start in range(0, len(page_items), cols_per_row):
+        cols = st.columns(cols_per_row, gap="large")
+        for i, col in enumerate(cols):
+            idx = row_start + i
+            if idx >= len(page_items):
+                continue
+            rec = get_ad_record(page_items[idx])
+            page_name = rec.page_name or "(no page name)"
+            ad_archive_id = rec.ad_archive_id or f"#{start_idx + idx}"
+            status = rec.status
+            media_url = rec.original_image_url
+            with col:
+                media_html = f"<div class='fb-card-media'><img src='{media_url}'/></div>" if media_url else ""
+                st.markdown(
+                    f"""
+                    <div class='fb-card-wrapper'>
+                        {media_html}
+                        <div class='fb-card'>
+                            <div class='fb-card-badges'>
+                                <span class='fb-card-badge'>{status}</span>
+                            </div>
+                            <div class='fb-card-header'>
+                                <div class='fb-card-brand'>{page_name}</div>
+                                <div class='fb-card-sub'>Archive ID: {ad_archive_id}</div>
+                            </div>
+                        </div>
+                    </div>
+                    """,
+                    unsafe_allow_html=True,
+                )
+
+
+@fragment
+def _render_card_actions(idx: int, ad: Dict[str, Any]):
+    """
+    Save / download controls for one grid card. Runs as a fragment, so saving never
+    re-renders the grid.
+    """
+    rec = get_ad_record(ad)
+    _card_save_controls(idx, rec.as_fields(), ad)
+    # Only for the card being saved, so rendering the page doesn't wait on every creative
+    if st.session_state.get("save_pending_idx") == idx:
+        media_download_button(rec.media_url, rec.ad_archive_id or f"{idx + 1}", rec.media_type or "image", key=f"media_download_{idx}")
+
+
+@fragment
+def _render_bulk_save(ads: List[Dict[str, Any]]):
+    """Save every ad matching the filters to one team (one transaction; reruns only this panel)."""
+    with st.expander(f"💾 Save all {len(ads)} filtered ads to a team"):
+        team = st.selectbox("Save to team", options=logic.get_all_teams(), key="bulk_save_team")
+        if st.button(f"Save {len(ads)} ads to {team}", key="bulk_save_confirm", use_container_width=True):
+            with st.spinner(f"Saving {len(ads)} ads..."):
+                stats = logic.db_insert_team_bulk(team, ((get_ad_record(ad).as_fields(), ad) for ad in ads))
+            st.success(
+                f"✅ {stats['inserted']} ads added to {team}; "
+                f"{stats['updated']} were already there and got refreshed."
+            )
+
 
 def render_main_search_page(
     ads_items: List[Dict[str, Any]],
@@ -256,6 +381,11 @@ def render_main_search_page(
     """, unsafe_allow_html=True)
     
     if ads_items:
+        # One normalized record per ad (memoized), shared by cards, filters and exports
+        records = normalize_items(ads_items)
+        # Status masks, category postings and sort orders, built once per result set
+        result_index = get_result_index(ads_items)
+        
         # Get the requested count from session state
         requested_count = st.session_state.get("last_query_params", {}).get("count", "Unknown")
         
@@ -267,23 +397,22 @@ def render_main_search_page(
         </div>
         """, unsafe_allow_html=True)
         
-        # Statistics section (removed Campaign Overview box as requested)
-        active_ads = sum(1 for ad in ads_items if ad.get("Active", False) or str(ad.get("Active", "")).lower() == "true")
-        inactive_ads = len(ads_items) - active_ads
-        
         # Export section
         st.markdown("""
         <div class="export-section">
             <div class="export-title">📊 Export & Download Options</div>
         """, unsafe_allow_html=True)
         
-        # Export buttons
-        exp_cols = st.columns(4)
+        # Export buttons: files are built only when a button is clicked, once per result set
+        exports = get_export_cache(ads_items, result_index.fingerprint)
+        summary_params = params
+        summary_generated = st.session_state.get('search_timestamp', 'N/A')
+        exp_cols = st.columns(3) + st.columns(3)
         
         with exp_cols[0]:
-            st.download_button(
-                label="📄 JSON Export",
-                data=json.dumps(ads_items, indent=2, ensure_ascii=False),
+            lazy_download_button(
+                "📄 JSON Export",
+                exports.json,
                 file_name=f"fb_ads_export_{len(ads_items)}.json",
                 mime="application/json",
                 key="download_json",
@@ -292,10 +421,20 @@ def render_main_search_page(
             )
             
         with exp_cols[1]:
-            df = logic.ads_to_dataframe(ads_items)
-            st.download_button(
-                label="📊 CSV Export",
-                data=df.to_csv(index=False),
+            lazy_download_button(
+                "🧾 NDJSON Export",
+                exports.ndjson,
+                file_name=f"fb_ads_export_{len(ads_items)}.ndjson",
+                mime="application/x-ndjson",
+                key="download_ndjson",
+                use_container_width=True,
+                help="Download raw ad data as newline-delimited JSON (one ad per line)"
+            )
+            
+        with exp_cols[2]:
+            lazy_download_button(
+                "📊 CSV Export",
+                exports.csv,
                 file_name=f"fb_ads_curated_{len(ads_items)}.csv",
                 mime="text/csv",
                 key="download_csv",
@@ -303,54 +442,24 @@ def render_main_search_page(
                 help="Download processed ad data in CSV format"
             )
             
-        with exp_cols[2]:
-            # Create detailed summary report
-            # Calculate percentages safely
-            active_percent = round(active_ads/len(ads_items)*100, 1) if ads_items else 0
-            inactive_percent = round(inactive_ads/len(ads_items)*100, 1) if ads_items else 0
-            
-            summary_text = f"""Facebook Ad Campaign Analysis Report
-Generated: {st.session_state.get('search_timestamp', 'N/A')}
-Search Parameters: {params if params else 'N/A'}
-
-EXECUTIVE SUMMARY
-================
-Total Unique Ads Analyzed: {len(ads_items)}
-Active Campaigns: {active_ads} ({active_percent}%)
-Inactive Campaigns: {inactive_ads} ({inactive_percent}%)
-
-PLATFORM DISTRIBUTION
-====================
-Facebook: {len(ads_items)} ads (100%)
-"""
-            # Remove platform distribution loop in export/summary section
-            # If you want to show only Facebook, just add a line:
-            # summary_text += f"""
-            # Facebook: {len(ads_items)} ads (100%)
-            # """
-                
-            summary_text += f"""
-
-TOP PERFORMING METRICS
-=====================
-Most Common Platform: Facebook
-Longest Running Campaign: {max([days for ad in ads_items if (days := logic.compute_running_days(ad)) is not None and days > 0], default=0)} days
-
-CAMPAIGN CATEGORIES
-==================
-"""
-            categories = {}
-            for ad in ads_items:
-                cats = ad.get("Categories", "Uncategorized")
-                if cats != "N/A":
-                    categories[cats] = categories.get(cats, 0) + 1
+        with exp_cols[3]:
+            if PARQUET_AVAILABLE:
+                lazy_download_button(
+                    "🗜️ Parquet Export",
+                    exports.parquet,
+                    file_name=f"fb_ads_curated_{len(ads_items)}.parquet",
+                    mime="application/vnd.apache.parquet",
+                    key="download_parquet",
+                    use_container_width=True,
+                    help="Download processed ad data in compact, columnar Parquet format"
+                )
+            else:
+                st.caption("Parquet export needs pyarrow installed")
             
-            for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True)[:10]:
-                summary_text += f"{cat}: {count} campaigns\n"
-                
-            st.download_button(
-                label="📋 Summary Report",
-                data=summary_text,
+        with exp_cols[4]:
+            lazy_download_button(
+                "📋 Summary Report",
+                lambda: _summary_report(ads_items, records, result_index, summary_params, summary_generated),
                 file_name=f"ad_analysis_report_{len(ads_items)}.txt",
                 mime="text/plain",
                 key="download_summary",
@@ -358,10 +467,10 @@ CAMPAIGN CATEGORIES
                 help="Download comprehensive analysis report"
             )
             
-        with exp_cols[3]:
+        with exp_cols[5]:
             with st.expander("🔍 Data Preview", expanded=False):
-                st.dataframe(df.head(5), use_container_width=True, key="curated_df")
-                st.caption(f"Showing 5 of {len(df)} rows")
+                st.dataframe(logic.ads_to_dataframe(ads_items[:5]), use_container_width=True, key="curated_df")
+                st.caption(f"Showing {min(5, len(ads_items))} of {len(ads_items)} rows")
         
         st.markdown("</div>", unsafe_allow_html=True)
         
@@ -380,7 +489,7 @@ CAMPAIGN CATEGORIES
         with col1:
             status_filter = st.selectbox(
                 "Status Filter",
-                options=["All Ads", "Active Only", "Inactive Only"],
+                options=list(STATUS_OPTIONS),
                 key="status_filter",
                 help="Filter ads by their current status"
             )
@@ -395,56 +504,25 @@ CAMPAIGN CATEGORIES
             )
             
         with col3:
-            sort_options = ["Most Recent", "Oldest First", "Active First", "Page Name A-Z", "Longest Running"]
             sort_by = st.selectbox(
                 "Sort Order",
-                options=sort_options,
+                options=list(SORT_OPTIONS),
                 key="sort_by",
                 help="Choose how to sort the ad cards"
             )
             
         with col4:
             # Category filter
-            all_categories = set()
-            for ad in ads_items:
-                cats = ad.get("Categories", "Uncategorized")
-                if cats != "N/A":
-                    all_categories.add(cats)
-            
-            category_options = ["All Categories"] + sorted(list(all_categories))
             category_filter = st.selectbox(
                 "Category Filter",
-                options=category_options,
+                options=result_index.category_options,
                 key="category_filter",
                 help="Filter by ad category"
             )
         
-        # Apply filters
-        filtered_ads = ads_items.copy()
-        
-        if status_filter == "Active Only":
-            filtered_ads = [ad for ad in filtered_ads if ad.get("Active", False)]
-        elif status_filter == "Inactive Only":
-            filtered_ads = [ad for ad in filtered_ads if not ad.get("Active", False)]
-            
-        # Since all ads are from Facebook, we don't need platform filtering
-        # if platform_filter != "All Platforms":
-        #     filtered_ads = [ad for ad in filtered_ads if ad.get("Publisher_Platform") == platform_filter]
-            
-        if category_filter != "All Categories":
-            filtered_ads = [ad for ad in filtered_ads if ad.get("Categories") == category_filter]
-        
-        # Apply sorting
-        if sort_by == "Most Recent":
-            filtered_ads.sort(key=lambda x: x.get("Start_Date", ""), reverse=True)
-        elif sort_by == "Oldest First":
-            filtered_ads.sort(key=lambda x: x.get("Start_Date", ""))
-        elif sort_by == "Active First":
-            filtered_ads.sort(key=lambda x: x.get("Active", False), reverse=True)
-        elif sort_by == "Page Name A-Z":
-            filtered_ads.sort(key=lambda x: x.get("pageName", x.get("Page_Name", "")).lower())
-        elif sort_by == "Longest Running":
-            filtered_ads.sort(key=lambda x: logic.compute_running_days(x) or 0, reverse=True)
+        # Apply filters and sorting: slices of the precomputed index, no per-ad work
+        # (all ads are from Facebook, so there is no platform filtering)
+        filtered_ads = result_index.select(status_filter, category_filter, sort_by)
         
         # Show filtered count
         if len(filtered_ads) != len(ads_items):
@@ -456,28 +534,64 @@ CAMPAIGN CATEGORIES
         
         # Render ad cards in a responsive grid
         if filtered_ads:
+            # All creatives of the filtered set as one ZIP, built only when clicked
+            lazy_download_button(
+                f"📦 Download all creatives ({len(filtered_ads)} ads, ZIP)",
+                lambda: build_media_zip(filtered_ads),
+                file_name=f"fb_ads_creatives_{len(filtered_ads)}.zip",
+                mime="application/zip",
+                key="download_creatives_zip",
+                help="Images and videos of every ad matching the filters, with a manifest.csv of their fields"
+            )
+            _render_bulk_save(filtered_ads)
             st.markdown("""
             <div class="ads-section-title">🎯 Ad Campaign Cards</div>
             """, unsafe_allow_html=True)
             
-            # Use responsive grid layout
+            # Paginated grid: only the visible page is built and sent to the browser
             cols_per_row = 3
-            for row_start in range(0, len(filtered_ads), cols_per_row):
-                cols = st.columns(cols_per_row, gap="large")
-                for i, col in enumerate(cols):
-                    idx = row_start + i
-                    if idx >= len(filtered_ads):
-                        continue
-                    ad = filtered_ads[idx]
-                    with col:
-                        render_ad_card(
-                            item=ad,
-                            idx=idx,
-                            variant="search",
-                            raw_item=ad,
-                            image_url=ad.get(card_image_key) if card_image_key else None,
-                            footer=footer_format
-                        )
+            page_size = st.selectbox(
+                "Cards per page",
+                options=list(GRID_PAGE_SIZE_OPTIONS),
+                index=list(GRID_PAGE_SIZE_OPTIONS).index(GRID_DEFAULT_PAGE_SIZE),
+                key="results_page_size",
+            )
+            # Back to the first page whenever the result set, filters or sort change
+            view_sig = (result_index.fingerprint, status_filter, category_filter, sort_by, page_size)
+            if st.session_state.get("results_page_sig") != view_sig:
+                st.session_state["results_page_sig"] = view_sig
+                st.session_state["results_page"] = 0
+                st.session_state["_results_grid_cache"] = {}
+            # A refresh can keep every id but change statuses/dates: cached card HTML is
+            # only valid for the items list it was built from
+            if st.session_state.get("_results_grid_items") is not ads_items:
+                st.session_state["_results_grid_items"] = ads_items
+                st.session_state["_results_grid_cache"] = {}
+            page = min(st.session_state.get("results_page", 0), page_count(len(filtered_ads), page_size) - 1)
+            start = page * page_size
+            page_ads = filtered_ads[start:start + page_size]
+            next_ads = filtered_ads[start + page_size:start + 2 * page_size]
+
+            enable_pager_keyboard()
+            render_page_nav("results_page", len(filtered_ads), page_size)
+            grid_cache = st.session_state.setdefault("_results_grid_cache", {})
+            grid_html = grid_cache.get(page)
+            if grid_html is None:
+                grid_html = build_ad_grid_html(
+                    page_ads,
+                    start_idx=start,
+                    cols_per_row=cols_per_row,
+                    image_url_key=card_image_key,
+                    prefetch_urls=grid_image_urls(next_ads, card_image_key),
+                )
+                # Keep the pages visited last; prefetch_urls already started the next
+                # page's thumbnails in the background, its HTML is built when it's opened
+                grid_cache[page] = grid_html
+                while len(grid_cache) > GRID_HTML_CACHE_PAGES:
+                    grid_cache.pop(next(iter(grid_cache)))
+            # Warm the page's creatives so download clicks are served from local bytes
+            prefetch_media(get_ad_record(ad).media_url for ad in page_ads)
+            render_grid_with_actions(grid_html, page_ads, start_idx=start, cols_per_row=cols_per_row, card_actions=_render_card_actions)
         else:
             st.markdown("""
             <div class="no-results">
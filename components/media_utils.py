@@ -0,0 +1,225 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared keep-alive pool for every media request (prefetch, downloads, thumbnails)
+MEDIA_WORKERS = 12
+MEDIA_PER_HOST = 4          # concurrent requests to any one CDN host
+MEDIA_POOL_SIZE = 16        # kept-alive connections per host
+MEDIA_CONNECT_TIMEOUT = 5
+MEDIA_READ_TIMEOUT = 20
+MEDIA_RETRIES = 3
+MEDIA_BACKOFF = 0.5
+
+# In-memory LRU of fetched bytes
+MEDIA_CACHE_MAX_BYTES = 256 * 1024 * 1024
+MEDIA_MAX_BYTES = 64 * 1024 * 1024  # larger files are never cached (or prefetched)
+
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+
+class MediaBlob(NamedTuple):
+    data: bytes
+    content_type: str
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=MEDIA_RETRIES,
+        backoff_factor=MEDIA_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=MEDIA_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(_HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_session = _build_session()
+_executor = ThreadPoolExecutor(max_workers=MEDIA_WORKERS, thread_name_prefix="media")
+_lock = threading.Lock()
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_inflight: Dict[str, Future] = {}
+_cache: "OrderedDict[str, MediaBlob]" = OrderedDict()
+_cache_bytes = 0
+# Lookups tried before the network (e.g. the saved-ads media mirror)
+_local_sources: List[Callable[[str], Optional[MediaBlob]]] = []
+
+
+def register_local_source(source: Callable[[str], Optional[MediaBlob]]) -> None:
+    """Serve `url` from `source(url)` when it returns bytes, instead of downloading it."""
+    if source not in _local_sources:
+        _local_sources.append(source)
+
+
+def _local_media(url: str) -> Optional[MediaBlob]:
+    for source in _local_sources:
+        blob = source(url)
+        if blob is not None:
+            return blob
+    return None
+
+
+def is_fetchable(url: Optional[str]) -> bool:
+    return bool(url) and url.startswith(("http://", "https://"))
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc.lower()
+    with _lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(MEDIA_PER_HOST)
+        return slot
+
+
+def cached_media(url: Optional[str]) -> Optional[MediaBlob]:
+    """Bytes already fetched for `url`, without any network access."""
+    if not url:
+        return None
+    with _lock:
+        blob = _cache.get(url)
+        if blob is not None:
+            _cache.move_to_end(url)
+        return blob
+
+
+def _store(url: str, blob: MediaBlob) -> None:
+    global _cache_bytes
+    with _lock:
+        old = _cache.pop(url, None)
+        if old is not None:
+            _cache_bytes -= len(old.data)
+        _cache[url] = blob
+        _cache_bytes += len(blob.data)
+        while _cache_bytes > MEDIA_CACHE_MAX_BYTES and len(_cache) > 1:
+            _, evicted = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted.data)
+
+
+def _fetch(url: str, store: bool = True) -> Optional[MediaBlob]:
+    blob = _local_media(url)
+    if blob is not None:
+        if store:
+            _store(url, blob)
+        return blob
+    try:
+        with _host_slot(url):
+            with _session.get(url, timeout=(MEDIA_CONNECT_TIMEOUT, MEDIA_READ_TIMEOUT), stream=True) as resp:
+                resp.raise_for_status()
+                if int(resp.headers.get("Content-Length") or 0) > MEDIA_MAX_BYTES:
+                    raise ValueError("file too large to cache")
+                data = resp.raw.read(MEDIA_MAX_BYTES + 1, decode_content=True)
+                content_type = resp.headers.get("Content-Type", "").split(";")[0].strip()
+    except Exception as e:  # noqa: BLE001
+        print(f"⚠️ Media fetch failed for {url[:80]}: {e}")
+        return None
+    if len(data) > MEDIA_MAX_BYTES:
+        print(f"⚠️ Media too large to cache: {url[:80]}")
+        return None
+    blob = MediaBlob(data, content_type)
+    if store:
+        _store(url, blob)
+    return blob
+
+
+def _done(url: str, _future: Future) -> None:
+    with _lock:
+        _inflight.pop(url, None)
+
+
+def _submit(url: str) -> Future:
+    """Future for fetching `url`; concurrent requests for the same URL share one fetch."""
+    with _lock:
+        future = _inflight.get(url)
+        submitted = future is None
+        if submitted:
+            future = _inflight[url] = _executor.submit(_fetch, url)
+    if submitted:  # outside the lock: the callback runs at once if it already finished
+        future.add_done_callback(lambda f, url=url: _done(url, f))
+    return future
+
+
+def prefetch_media(urls: Iterable[Optional[str]]) -> None:
+    """Warm the cache for `urls` in the background (e.g. every creative on a result page)."""
+    for url in dict.fromkeys(u for u in urls if is_fetchable(u)):
+        if cached_media(url) is None:
+            _submit(url)
+
+
+def fetch_media(url: Optional[str], timeout: Optional[float] = None) -> Optional[MediaBlob]:
+    """
+    Bytes and content type for `url`: from the cache, from an in-flight prefetch,
+    or fetched now over the shared pool. None on failure or after `timeout` seconds.
+    """
+    if not is_fetchable(url):
+        return None
+    blob = cached_media(url)
+    if blob is not None:
+        return blob
+    try:
+        return _submit(url).result(timeout=timeout)
+    except FutureTimeout:
+        return None
+
+
+def iter_media(urls: Iterable[Optional[str]], window: int = MEDIA_WORKERS * 2) -> Iterator[Tuple[Optional[str], Optional[MediaBlob]]]:
+    """
+    Yield (url, blob or None) for each URL in order, fetching up to `window` ahead concurrently.
+
+    For bulk jobs: cached bytes are reused, but new downloads bypass the cache, so at most
+    `window` files are held in memory at a time.
+    """
+    pending: "deque[Tuple[Optional[str], Optional[Future]]]" = deque()
+    for url in urls:
+        future = None
+        if is_fetchable(url) and cached_media(url) is None:
+            future = _executor.submit(_fetch, url, False)
+        pending.append((url, future))
+        if len(pending) >= window:
+            yield _resolve(*pending.popleft())
+    while pending:
+        yield _resolve(*pending.popleft())
+
+
+def _resolve(url: Optional[str], future: Optional[Future]) -> Tuple[Optional[str], Optional[MediaBlob]]:
+    if future is not None:
+        return url, future.result()
+    return url, cached_media(url)
+
+
+def media_content_type(url: Optional[str]) -> Optional[str]:
+    """Content type of `url`: from cached bytes when available, else a HEAD request on the pool."""
+    blob = cached_media(url)
+    if blob is None and is_fetchable(url):
+        blob = _local_media(url)
+    if blob is not None:
+        return blob.content_type or None
+    if not is_fetchable(url):
+        return None
+    try:
+        with _host_slot(url):
+            resp = _session.head(url, timeout=(MEDIA_CONNECT_TIMEOUT, MEDIA_READ_TIMEOUT), allow_redirects=True)
+        return resp.headers.get("Content-Type", "").split(";")[0].strip() or None
+    except requests.RequestException:
+        return None
+
+
+def clear_media_cache() -> None:
+    global _cache_bytes
+    with _lock:
+        _cache.clear()
+        _cache_bytes = 0
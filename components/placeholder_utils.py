@@ -0,0 +1,73 @@
+from __future__ import annotations
+import html
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import quote
+
+# Card theme (same gradient as the card header and buttons)
+PLACEHOLDER_FROM = "#6366f1"
+PLACEHOLDER_TO = "#764ba2"
+PLACEHOLDER_TEXT = "#ffffff"
+PLACEHOLDER_LABEL = "Ad Preview"
+PLACEHOLDER_FONT = "-apple-system, BlinkMacSystemFont, Segoe UI, Roboto, Helvetica, Arial, sans-serif"
+
+# Sizes the card and its modal ask for
+CARD_PLACEHOLDER_SIZE = (400, 250)
+MODAL_PLACEHOLDER_SIZE = (600, 400)
+
+
+def placeholder_svg(
+    width: int,
+    height: int,
+    initial: Optional[str] = None,
+    label: str = PLACEHOLDER_LABEL,
+    color_from: str = PLACEHOLDER_FROM,
+    color_to: str = PLACEHOLDER_TO,
+) -> str:
+    """SVG markup for a media placeholder: theme gradient, optional brand initial badge and a label."""
+    label_size = max(12, min(width, height) // 12)
+    font = html.escape(PLACEHOLDER_FONT, quote=True)
+    parts = [
+        f"<svg xmlns='http://www.w3.org/2000/svg' width='{width}' height='{height}' viewBox='0 0 {width} {height}'>",
+        "<defs><linearGradient id='g' x1='0' y1='0' x2='1' y2='1'>"
+        f"<stop offset='0' stop-color='{html.escape(color_from, quote=True)}'/>"
+        f"<stop offset='1' stop-color='{html.escape(color_to, quote=True)}'/>"
+        "</linearGradient></defs>",
+        "<rect width='100%' height='100%' fill='url(#g)'/>",
+    ]
+    if initial:
+        r = min(width, height) // 5
+        cy = height // 2 - label_size
+        parts.append(f"<circle cx='{width // 2}' cy='{cy}' r='{r}' fill='{PLACEHOLDER_TEXT}' fill-opacity='0.18'/>")
+        parts.append(
+            f"<text x='50%' y='{cy}' dy='0.35em' text-anchor='middle' font-family='{font}' "
+            f"font-size='{r}' font-weight='700' fill='{PLACEHOLDER_TEXT}'>{html.escape(initial)}</text>"
+        )
+        label_y = cy + r + label_size + label_size // 2
+    else:
+        label_y = height // 2
+    parts.append(
+        f"<text x='50%' y='{label_y}' dy='0.35em' text-anchor='middle' font-family='{font}' "
+        f"font-size='{label_size}' font-weight='600' fill='{PLACEHOLDER_TEXT}' fill-opacity='0.9'>{html.escape(label)}</text>"
+    )
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+@lru_cache(maxsize=512)
+def placeholder_data_uri(
+    width: int,
+    height: int,
+    initial: Optional[str] = None,
+    label: str = PLACEHOLDER_LABEL,
+    color_from: str = PLACEHOLDER_FROM,
+    color_to: str = PLACEHOLDER_TO,
+) -> str:
+    """
+    placeholder_svg as a data: URI usable in <img src> (no network request).
+
+    Built once per distinct size / initial / label / colors.
+    """
+    svg = placeholder_svg(width, height, initial, label, color_from, color_to)
+    return "data:image/svg+xml;charset=utf-8," + quote(svg, safe=" =:/;,()-.")
+
@@ -2,6 +2,7 @@ from __future__ import annotations
 import streamlit as st
 import logic
 from typing import Optional, Dict, Any
+from components.adRecord import get_ad_record
 
 def render_ad_card(item: Dict[str, Any], idx: int, variant: str, *,
                    team: Optional[str] = None,
@@ -9,14 +10,15 @@ def render_ad_card(item: Dict[str, Any], idx: int, variant: str, *,
                    image_url: Optional[str] = None,
                    footer: Optional[str] = None):
 
-    f = logic.extract_selected_fields(item)
+    rec = get_ad_record(item)
+    f = rec.as_fields()
 
-    page_name = f.get("page_name") or item.get("pageName") or "(no page name)"
-    ad_text = item.get("adText") or item.get("ad_text") or item.get("text") or ""
+    page_name = rec.page_name or item.get("pageName") or "(no page name)"
+    ad_text = rec.ad_text
     short_text = logic.summarize_text(ad_text, 200)
-    ad_archive_id = f.get("ad_archive_id") or item.get("adId") or item.get("id") or f"#{idx}"
-    status = logic.detect_status(item)
-    running_days = logic.compute_running_days(item)
+    ad_archive_id = rec.ad_archive_id or item.get("adId") or item.get("id") or f"#{idx}"
+    status = rec.status
+    running_days = rec.running_days
 
     # Prefer provided image, fallback to logic
     media_url = image_url
@@ -2,119 +2,232 @@ from __future__ import annotations
 import streamlit as st
 import logic
 from typing import Optional, List, Dict, Any
-from components.dbtoItem import _db_row_to_item
-from components.adCard import render_ad_card
+from components.dbtoItem import _db_row_to_item, db_rows_to_items
+from components.adGrid import PAGER_NEXT_LABEL, PAGER_PREV_LABEL, enable_pager_keyboard, render_ad_grid
 from components.dbtoItem import render_saved_ad_detail
+from components.adRecord import get_ad_record
+from components.fragment_utils import fragment, rerun_fragment
+from components.export_utils import lazy_download_button
+from components.zip_utils import build_media_zip
 
-def render_saved_ads_page(team: str, rows: List[Dict[str, Any]], card_image_key: Optional[str] = None, footer_format: bool = False):
+
+@fragment
+def _render_remove_panel(team: str, idx: int, ad: Dict[str, Any]):
+    """Remove button for one grid card; clicking and confirming rerun only this panel."""
+    # --- Styled Delete Button with Confirmation ---
+    delete_btn = st.button(
+        "🗑️ Remove this Ad",
+        key=f"delete_{team}_{idx}",
+        use_container_width=True,
+        help="Remove this ad from saved ads."
+    )
+    st.markdown("""
+    <style>
+    .stButton > button[data-testid^='button'][key^='delete_'] {
+        background: linear-gradient(90deg, #ef4444 60%, #b91c1c 100%) !important;
+        color: #fff !important;
+        border-radius: 8px !important;
+        font-weight: 700 !important;
+        margin-top: 10px !important;
+        margin-bottom: 10px !important;
+        box-shadow: 0 2px 8px rgba(239,68,68,0.10);
+    }
+    .stButton > button[data-testid^='button'][key^='delete_']:hover {
+        background: linear-gradient(90deg, #b91c1c 60%, #ef4444 100%) !important;
+        color: #fff !important;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # Handle delete button click
+    if delete_btn:
+        st.session_state[f"delete_pending_{team}_{idx}"] = True
+        # Debug info
+        ad_id = ad.get("ad_archive_id") or ad.get("adId") or ad.get("id")
+        print(f"Delete button clicked for ad {ad_id} in team {team}")
+
+    # Handle delete confirmation
+    if st.session_state.get(f"delete_pending_{team}_{idx}", False):
+        st.warning("⚠️ Are you sure you want to remove this ad?")
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            if st.button("✅ Yes, Delete", key=f"confirm_yes_{team}_{idx}", type="primary"):
+                try:
+                    # Debug: Print the ad data being deleted
+                    ad_id = ad.get("ad_archive_id")
+                    print(f"Deleting ad with ID: {ad_id}")
+                    print(f"Full ad data: {ad}")
+
+                    # Delete from database
+                    success = logic.db_delete_ad(team, ad)
+                    # Clear session state
+                    st.session_state.pop(f"delete_pending_{team}_{idx}", None)
+
+                    if success:
+                        # Show success message
+                        st.success(f"✅ Ad successfully removed from {team}!")
+                        # Full rerun: the grid and pager have to reflect the removal
+                        st.rerun()
+                    else:
+                        # Show error message
+                        st.error(f"❌ Failed to delete ad from {team}. Ad may not exist in database.")
+                except Exception as e:
+                    st.error(f"❌ Error deleting ad: {str(e)}")
+        with col2:
+            if st.button("❌ Cancel", key=f"confirm_no_{team}_{idx}"):
+                st.session_state.pop(f"delete_pending_{team}_{idx}", None)
+                rerun_fragment()
+
+
+BULK_ACTIONS = ("🗑️ Remove", "📦 Move to team", "📋 Copy to team")
+
+
+@fragment
+def _render_bulk_panel(team: str, items: List[Dict[str, Any]], start_idx: int = 0):
+    """
+    Multi-select actions on saved ads: remove, move or copy the picked cards (or the
+    whole team) with one SQL statement per action. Picking reruns only this panel.
+    """
+    with st.expander("☑️ Select several ads"):
+        whole_team = st.checkbox(f"Every ad in {team}", key=f"bulk_all_{team}")
+        picked = st.multiselect(
+            "Ads on this page",
+            options=list(range(len(items))),
+            format_func=lambda i: f"#{start_idx + i + 1} — {items[i].get('page_name') or items[i].get('ad_archive_id') or ''}",
+            key=f"bulk_pick_{team}_{start_idx}",
+            disabled=whole_team,
+        )
+        ad_ids = None if whole_team else [items[i].get("ad_archive_id") for i in picked if items[i].get("ad_archive_id")]
+        label = f"all ads in {team}" if whole_team else f"{len(ad_ids)} selected ads"
+
+        action = st.radio("Action", BULK_ACTIONS, horizontal=True, key=f"bulk_action_{team}")
+        target = None
+        if action != BULK_ACTIONS[0]:
+            others = [t for t in logic.get_all_teams() if t != team]
+            target = st.selectbox("Target team", options=others, key=f"bulk_target_{team}")
+        disabled = (ad_ids is not None and not ad_ids) or (action != BULK_ACTIONS[0] and not target)
+
+        pending_key = f"bulk_pending_{team}"
+        if st.button(f"Apply to {label}", key=f"bulk_apply_{team}", disabled=disabled, use_container_width=True):
+            if action == BULK_ACTIONS[0]:
+                st.session_state[pending_key] = True
+            else:
+                _apply_bulk_action(team, action, target, ad_ids)
+        if st.session_state.get(pending_key) and not disabled and action == BULK_ACTIONS[0]:
+            st.warning(f"⚠️ Remove {label}?" if whole_team else f"⚠️ Remove {label} from {team}?")
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                if st.button("✅ Yes, Remove", key=f"bulk_confirm_{team}", type="primary"):
+                    st.session_state.pop(pending_key, None)
+                    _apply_bulk_action(team, action, None, ad_ids)
+            with col2:
+                if st.button("❌ Cancel", key=f"bulk_cancel_{team}"):
+                    st.session_state.pop(pending_key, None)
+                    rerun_fragment()
+
+
+def _apply_bulk_action(team: str, action: str, target: Optional[str], ad_ids: Optional[List[str]]):
+    """Run a bulk action, then one full rerun so the grid and pager reflect it."""
+    try:
+        if action == BULK_ACTIONS[0]:
+            count = logic.db_delete_ads(team, ad_ids)
+            message = f"✅ Removed {count} ads from {team}"
+        elif action == BULK_ACTIONS[1]:
+            count = logic.db_move_ads(team, target, ad_ids)
+            message = f"✅ Moved {count} ads to {target}"
+        else:
+            count = logic.db_copy_ads(team, target, ad_ids)
+            message = f"✅ Copied {count} ads to {target} (ads already there were skipped)"
+    except Exception as e:
+        st.error(f"❌ Bulk action failed: {str(e)}")
+        return
+    st.session_state[f"bulk_result_{team}"] = message
+    # Picked card numbers would point at other ads now
+    for key in [k for k in st.session_state if str(k).startswith((f"bulk_pick_{team}_", f"bulk_all_{team}", f"delete_pick_{team}_"))]:
+        st.session_state.pop(key, None)
+    st.rerun()
+
+
+def render_saved_team_page(team: str):
+    """Saved Ads view for one team, fetched one keyset page at a time."""
+    state_key = f"saved_page_{team}"
+    state = st.session_state.get(state_key) or {"after": None, "before": None, "page": 0}
+    page = logic.db_fetch_team_page(team, after=state["after"], before=state["before"])
+
+    # Page emptied by deletes: go back to the first page
+    if not page["rows"] and state["page"] > 0:
+        st.session_state.pop(state_key, None)
+        st.rerun()
+
+    render_saved_ads_page(team, page["rows"], start_idx=state["page"] * logic.SAVED_ADS_PAGE_SIZE)
+    if page["rows"]:
+        # Whole team, not just this page; rows are only loaded when the button is clicked
+        lazy_download_button(
+            "📦 Download all creatives (ZIP)",
+            lambda: build_media_zip([_db_row_to_item(r) for r in logic.db_fetch_team(team)]),
+            file_name=f"{team}_creatives.zip".replace(" ", "_"),
+            mime="application/zip",
+            key=f"download_creatives_zip_{team}",
+            help="Images and videos of every ad saved to this team, with a manifest.csv of their fields"
+        )
+
+    if page["prev"] is None and page["next"] is None:
+        return
+    enable_pager_keyboard()
+    nav_prev, nav_label, nav_next = st.columns([1, 2, 1])
+    with nav_prev:
+        if st.button(PAGER_PREV_LABEL, key=f"saved_prev_{team}", disabled=page["prev"] is None, use_container_width=True):
+            st.session_state[state_key] = {"after": None, "before": page["prev"], "page": max(state["page"] - 1, 0)}
+            st.rerun()
+    with nav_label:
+        st.markdown(
+            f"<div style='text-align:center;padding-top:0.4rem;'>Page {state['page'] + 1}</div>",
+            unsafe_allow_html=True,
+        )
+    with nav_next:
+        if st.button(PAGER_NEXT_LABEL, key=f"saved_next_{team}", disabled=page["next"] is None, use_container_width=True):
+            st.session_state[state_key] = {"after": page["next"], "before": None, "page": state["page"] + 1}
+            st.rerun()
+
+
+def render_saved_ads_page(team: str, rows: List[Dict[str, Any]], card_image_key: Optional[str] = None, footer_format: bool = False, start_idx: int = 0):
     st.header(f"Saved Ads — {team}")
     if not rows:
         st.info("No ads saved yet.")
         return
 
-    items = [_db_row_to_item(r) for r in rows]
-
-    # Card grid
-    cols_per_row = 3
-    for row_start in range(0, len(items), cols_per_row):
-        cols = st.columns(cols_per_row, gap="large")
-        for i, col in enumerate(cols):
-            idx = row_start + i
-            if idx >= len(items):
-                continue
-            ad = items[idx]
-            with col:
-                render_ad_card(
-                    ad,
-                    idx,
-                    variant="saved",
-                    team=team,
-                    raw_item=ad,
-                    image_url=ad.get(card_image_key) if card_image_key else None,
-                    footer=(
-                        f"**{ad.get('page_name', '')}** – {ad.get('impressions', '')}, {ad.get('spend', '')}"
-                        if footer_format else None
-                    ),
-                )
-                # --- Styled Delete Button with Confirmation ---
-                delete_btn = st.button(
-                    "🗑️ Remove this Ad",
-                    key=f"delete_{team}_{idx}",
-                    use_container_width=True,
-                    help="Remove this ad from saved ads."
-                )
-                st.markdown("""
-                <style>
-                .stButton > button[data-testid^='button'][key^='delete_'] {
-                    background: linear-gradient(90deg, #ef4444 60%, #b91c1c 100%) !important;
-                    color: #fff !important;
-                    border-radius: 8px !important;
-                    font-weight: 700 !important;
-                    margin-top: 10px !important;
-                    margin-bottom: 10px !important;
-                    box-shadow: 0 2px 8px rgba(239,68,68,0.10);
-                }
-                .stButton > button[data-testid^='button'][key^='delete_']:hover {
-                    background: linear-gradient(90deg, #b91c1c 60%, #ef4444 100%) !important;
-                    color: #fff !important;
-                }
-                </style>
-                """, unsafe_allow_html=True)
-                
-                # Handle delete button click
-                if delete_btn:
-                    st.session_state[f"delete_pending_{team}_{idx}"] = True
-                    # Debug info
-                    ad_id = ad.get("ad_archive_id") or ad.get("adId") or ad.get("id")
-                    print(f"Delete button clicked for ad {ad_id} in team {team}")
-                
-                # Handle delete confirmation
-                if st.session_state.get(f"delete_pending_{team}_{idx}", False):
-                    st.warning("⚠️ Are you sure you want to remove this ad?")
-                    col1, col2 = st.columns([1, 1])
-                    with col1:
-                        if st.button("✅ Yes, Delete", key=f"confirm_yes_{team}_{idx}", type="primary"):
-                            try:
-                                # Debug: Print the ad data being deleted
-                                ad_id = ad.get("ad_archive_id")
-                                print(f"Deleting ad with ID: {ad_id}")
-                                print(f"Full ad data: {ad}")
-                                
-                                # Delete from database
-                                success = logic.db_delete_ad(team, ad)
-                                # Clear session state
-                                st.session_state.pop(f"delete_pending_{team}_{idx}", None)
-                                
-                                if success:
-                                    # Show success message
-                                    st.success(f"✅ Ad successfully removed from {team}!")
-                                    # Rerun to refresh the page
-                                    st.rerun()
-                                else:
-                                    # Show error message
-                                    st.error(f"❌ Failed to delete ad from {team}. Ad may not exist in database.")
-                            except Exception as e:
-                                st.error(f"❌ Error deleting ad: {str(e)}")
-                    with col2:
-                        if st.button("❌ Cancel", key=f"confirm_no_{team}_{idx}"):
-                            st.session_state.pop(f"delete_pending_{team}_{idx}", None)
-                            st.rerun()
+    items = db_rows_to_items(rows)
+
+    # Card grid with a Remove button beside each card (idx is the ad's position in the whole team)
+    render_ad_grid(
+        items,
+        start_idx=start_idx,
+        cols_per_row=3,
+        image_url_key=card_image_key,
+        card_actions=lambda idx, ad: _render_remove_panel(team, idx, ad),
+    )
+    result = st.session_state.pop(f"bulk_result_{team}", None)
+    if result:
+        st.success(result)
+    _render_bulk_panel(team, items, start_idx)
 
     # Detail panel
     sel_key = f"saved_selected_idx_{team}"
     sel_idx = st.session_state.get(sel_key)
-    if sel_idx is not None and 0 <= sel_idx < len(rows):
-        render_saved_ad_detail(rows[sel_idx])
+    if sel_idx is not None and 0 <= sel_idx - start_idx < len(rows):
+        # Card rows carry no raw_json; the detail view rehydrates the stored item on demand
+        render_saved_ad_detail(rows[sel_idx - start_idx])
 
         # =============================================================================
         # FOOTER DRAWER FOR AD DETAILS
         # =============================================================================
         def render_footer_drawer(item: dict, idx: int):
-            f = logic.extract_selected_fields(item)
-            page_name = f.get("page_name") or item.get("pageName") or "(no page name)"
-            ad_archive_id = f.get("ad_archive_id") or item.get("adId") or item.get("id") or f"#{idx}"
-            status = logic.detect_status(item)
-            running_days = logic.compute_running_days(item)
+            rec = get_ad_record(item)
+            f = rec.as_fields()
+            page_name = rec.page_name or item.get("pageName") or "(no page name)"
+            ad_archive_id = rec.ad_archive_id or item.get("adId") or item.get("id") or f"#{idx}"
+            status = rec.status
+            running_days = rec.running_days
             cta_text = f.get("cta_text") or "–"
             format_ = f.get("entity_type") or "–"
             niche = ", ".join(f.get("categories") or []) if f.get("categories") else "–"
@@ -0,0 +1,145 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import logic
+from components.adRecord import AdRecord, normalize_items
+
+STATUS_OPTIONS = ("All Ads", "Active Only", "Inactive Only")
+SORT_OPTIONS = ("Most Recent", "Oldest First", "Active First", "Page Name A-Z", "Longest Running")
+ALL_CATEGORIES = "All Categories"
+UNCATEGORIZED = "Uncategorized"
+
+# Result sets whose index is kept around (current search plus a few recent ones)
+RESULT_INDEX_CACHE_SIZE = 4
+
+
+def _category_label(rec: AdRecord) -> str:
+    return rec.categories or UNCATEGORIZED
+
+
+def _sort_keys(rec: AdRecord) -> Dict[str, Any]:
+    return {
+        "Most Recent": rec.start_date or "",
+        "Oldest First": rec.start_date or "",
+        "Active First": bool(rec.active),
+        "Page Name A-Z": (rec.page_name or "").lower(),
+        "Longest Running": rec.running_days or 0,
+    }
+
+
+_DESCENDING = {"Most Recent", "Active First", "Longest Running"}
+
+
+class ResultIndex:
+    """
+    Filter and sort index for one search result set.
+
+    Built once per result set from the memoized AdRecords: a boolean mask per status,
+    category -> row-id postings, and one precomputed ordering per sort option. Filtering
+    and sorting then only slice arrays; no dates are parsed and no items are re-read.
+    """
+    __slots__ = ("items", "fingerprint", "active_mask", "status_masks", "category_postings",
+                 "category_options", "orderings", "_last")
+
+    def __init__(self, items: List[Dict[str, Any]], fingerprint: Optional[str] = None):
+        records = normalize_items(items)
+        n = len(records)
+        self.items = items
+        self.fingerprint = fingerprint or logic.result_fingerprint(items)
+
+        self.active_mask = np.fromiter((bool(r.active) for r in records), dtype=bool, count=n)
+        self.status_masks = {
+            "All Ads": np.ones(n, dtype=bool),
+            "Active Only": self.active_mask,
+            "Inactive Only": ~self.active_mask,
+        }
+
+        postings: Dict[str, List[int]] = {}
+        for i, rec in enumerate(records):
+            postings.setdefault(_category_label(rec), []).append(i)
+        self.category_postings = {c: np.asarray(rows, dtype=np.intp) for c, rows in postings.items()}
+        self.category_options = [ALL_CATEGORIES] + sorted(self.category_postings)
+
+        # Stable sorts, so ties keep the order the scraper returned them in
+        keys = [_sort_keys(r) for r in records]
+        self.orderings = {
+            name: np.asarray(
+                sorted(range(n), key=lambda i, name=name: keys[i][name], reverse=name in _DESCENDING),
+                dtype=np.intp,
+            )
+            for name in SORT_OPTIONS
+        }
+        self._last = None
+
+    @property
+    def active_count(self) -> int:
+        return int(self.active_mask.sum())
+
+    def category_counts(self) -> Dict[str, int]:
+        """Number of ads per category label."""
+        return {c: len(rows) for c, rows in self.category_postings.items()}
+
+    def select_rows(self, status: str = "All Ads", category: str = ALL_CATEGORIES, sort_by: str = "Most Recent") -> np.ndarray:
+        """
+        Row ids of the ads matching `status` and `category`, in `sort_by` order.
+
+        Unknown status or sort values fall back to all ads in scrape order.
+        """
+        sig = (status, category, sort_by)
+        if self._last is not None and self._last[0] == sig:
+            return self._last[1]
+
+        n = len(self.items)
+        order = self.orderings.get(sort_by)
+        if order is None:
+            order = np.arange(n, dtype=np.intp)
+        mask = self.status_masks.get(status, self.status_masks["All Ads"])
+        if category != ALL_CATEGORIES:
+            cat_mask = np.zeros(n, dtype=bool)
+            cat_mask[self.category_postings.get(category, np.empty(0, dtype=np.intp))] = True
+            mask = mask & cat_mask
+        rows = order[mask[order]]
+        self._last = (sig, rows)
+        return rows
+
+    def select(self, status: str = "All Ads", category: str = ALL_CATEGORIES, sort_by: str = "Most Recent") -> List[Dict[str, Any]]:
+        """The matching raw items, in order (see select_rows)."""
+        items = self.items
+        return [items[i] for i in self.select_rows(status, category, sort_by)]
+
+
+_cache: "OrderedDict[str, ResultIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_result_index(items: List[Dict[str, Any]]) -> ResultIndex:
+    """
+    Return the index for a result set, building it on first use.
+
+    Indexes are keyed by result_fingerprint; a cached one is reused only for the very
+    same list object, so a refresh that keeps the ids but changes statuses is re-indexed.
+    """
+    fingerprint = logic.result_fingerprint(items)
+    with _cache_lock:
+        idx = _cache.get(fingerprint)
+        if idx is not None and idx.items is items:
+            _cache.move_to_end(fingerprint)
+            return idx
+
+    idx = ResultIndex(items, fingerprint)
+    with _cache_lock:
+        _cache[fingerprint] = idx
+        _cache.move_to_end(fingerprint)
+        while len(_cache) > RESULT_INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return idx
+
+
+def clear_result_indexes() -> None:
+    """Drop all cached indexes."""
+    with _cache_lock:
+        _cache.clear()
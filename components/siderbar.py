@@ -119,6 +119,6 @@ def render_filter_bar(*, country_label: str, ad_category_label: str, keyword: st
 def _card_save_ui(idx: int, ad_fields: dict, raw_item: dict):
     table = st.selectbox("Save to team", options=logic.get_all_teams(), key=f"save_select_{idx}")
     if st.button("Confirm save", key=f"confirm_save_{idx}"):
-        logic.db_insert_team(table, ad_fields, raw_item)
-        st.success(f"Saved to {table}!")
+        added = logic.db_insert_team(table, ad_fields, raw_item)
+        st.success(f"Saved to {table}!" if added else f"Already in {table}; its status was refreshed.")
         st.session_state.pop("save_pending_idx", None)
\ No newline at end of file
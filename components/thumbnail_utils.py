@@ -0,0 +1,253 @@
+from __future__ import annotations
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import streamlit as st
+from PIL import Image, ImageOps, features
+
+from components.media_utils import fetch_media
+
+# Thumbnails live under the app's static folder and are served by Streamlit at app/static/
+# (needs server.enableStaticServing, see .streamlit/config.toml)
+THUMB_ROOT = Path(__file__).resolve().parent.parent / "static" / "thumbs"
+THUMB_URL_PREFIX = "app/static/thumbs"
+
+# Bounding boxes (px) per size; cards show ~220px tall, the modal up to ~600px wide
+THUMB_SIZES = {"card": (480, 440), "modal": (1200, 1200)}
+THUMB_FORMAT, THUMB_EXT = ("WEBP", "webp") if features.check("webp") else ("JPEG", "jpg")
+THUMB_QUALITY = 80
+
+# Disk budget for the store; least recently used files are evicted past it.
+# Streamlit disables static serving altogether once the folder passes 1 GB.
+THUMB_CACHE_MAX_BYTES = 256 * 1024 * 1024
+THUMB_EVICT_EVERY_BYTES = 16 * 1024 * 1024
+
+THUMB_WORKERS = 8
+THUMB_MAX_SOURCE_BYTES = 20 * 1024 * 1024
+# Seconds a grid render waits for its page's thumbnails before falling back to originals
+THUMB_WAIT_SECONDS = 4.0
+# Seconds before a URL that failed to fetch or decode is tried again
+THUMB_RETRY_AFTER = 600
+
+_URL_INDEX_SIZE = 20000
+
+_executor = ThreadPoolExecutor(max_workers=THUMB_WORKERS, thread_name_prefix="thumbs")
+_lock = threading.Lock()
+_inflight: Dict[str, Future] = {}
+_failed: Dict[str, float] = {}
+_url_index: "OrderedDict[str, str]" = OrderedDict()  # source URL -> SHA-256 of its bytes
+_written_since_evict = 0
+
+
+def thumbnails_enabled() -> bool:
+    """Thumbnails are only usable when Streamlit serves the static folder."""
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:  # noqa: BLE001
+        return False
+
+
+def _is_remote(url: Optional[str]) -> bool:
+    return bool(url) and url.startswith(("http://", "https://"))
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _pointer_path(url: str) -> Path:
+    key = _url_key(url)
+    return THUMB_ROOT / "urls" / key[:2] / key
+
+
+def _thumb_path(digest: str, size: str) -> Path:
+    return THUMB_ROOT / digest[:2] / f"{digest}_{size}.{THUMB_EXT}"
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _lookup_digest(url: str) -> Optional[str]:
+    with _lock:
+        digest = _url_index.get(url)
+        if digest is not None:
+            _url_index.move_to_end(url)
+            return digest
+    try:
+        digest = _pointer_path(url).read_text().strip()
+    except OSError:
+        return None
+    _remember(url, digest)
+    return digest
+
+
+def _remember(url: str, digest: str) -> None:
+    with _lock:
+        _url_index[url] = digest
+        _url_index.move_to_end(url)
+        while len(_url_index) > _URL_INDEX_SIZE:
+            _url_index.popitem(last=False)
+
+
+def thumbnail_url(url: Optional[str], size: str = "card") -> Optional[str]:
+    """
+    Static URL of an already generated thumbnail of `url`, or None.
+
+    Never fetches; use warm_thumbnails to generate missing ones. A hit refreshes the
+    file's mtime, which is what LRU eviction goes by.
+    """
+    if not _is_remote(url) or not thumbnails_enabled():
+        return None
+    digest = _lookup_digest(url)
+    if digest is None:
+        return None
+    path = _thumb_path(digest, size)
+    try:
+        os.utime(path)
+        os.utime(_pointer_path(url))
+    except OSError:  # evicted
+        return None
+    return f"{THUMB_URL_PREFIX}/{digest[:2]}/{path.name}"
+
+
+def _render_thumbnails(data: bytes, digest: str) -> int:
+    """Write every THUMB_SIZES rendition of an image; returns bytes written."""
+    written = 0
+    with Image.open(BytesIO(data)) as img:
+        img.seek(0)  # first frame of animations
+        img = ImageOps.exif_transpose(img)
+        if THUMB_FORMAT == "JPEG":
+            img = img.convert("RGB")
+        elif img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+        for size, box in THUMB_SIZES.items():
+            path = _thumb_path(digest, size)
+            if path.exists():
+                continue
+            thumb = img.copy()
+            thumb.thumbnail(box, Image.LANCZOS)
+            out = BytesIO()
+            thumb.save(out, THUMB_FORMAT, quality=THUMB_QUALITY)
+            _atomic_write(path, out.getvalue())
+            written += out.tell()
+    return written
+
+
+def _generate(url: str) -> Optional[str]:
+    """Fetch `url` (shared media pool) and store its thumbnails; returns the content digest."""
+    global _written_since_evict
+    try:
+        blob = fetch_media(url)
+        if blob is None:
+            raise ValueError("fetch failed")
+        if blob.content_type and not blob.content_type.startswith("image/"):
+            raise ValueError(f"not an image ({blob.content_type})")
+        data = blob.data
+        if len(data) > THUMB_MAX_SOURCE_BYTES:
+            raise ValueError("source image too large")
+        digest = hashlib.sha256(data).hexdigest()
+        written = _render_thumbnails(data, digest)
+        _atomic_write(_pointer_path(url), digest.encode("ascii"))
+    except Exception as e:  # noqa: BLE001
+        print(f"⚠️ Thumbnail failed for {url[:80]}: {e}")
+        with _lock:
+            _failed[url] = time.monotonic()
+        return None
+
+    _remember(url, digest)
+    with _lock:
+        _written_since_evict += written
+        evict = _written_since_evict >= THUMB_EVICT_EVERY_BYTES
+        if evict:
+            _written_since_evict = 0
+    if evict:
+        evict_thumbnails()
+    return digest
+
+
+def _done(url: str, _future: Future) -> None:
+    with _lock:
+        _inflight.pop(url, None)
+
+
+def warm_thumbnails(urls: Iterable[Optional[str]], wait: float = 0.0) -> None:
+    """
+    Generate missing thumbnails for `urls` on the background pool.
+
+    Each source is fetched once, even when several renders ask for it at the same time.
+    With wait > 0, block up to that many seconds for them to finish.
+    """
+    if not thumbnails_enabled():
+        return
+    now = time.monotonic()
+    pending = []
+    for url in dict.fromkeys(u for u in urls if _is_remote(u)):
+        digest = _lookup_digest(url)
+        if digest is not None and all(_thumb_path(digest, s).exists() for s in THUMB_SIZES):
+            continue
+        with _lock:
+            failed_at = _failed.get(url)
+            if failed_at is not None and now - failed_at < THUMB_RETRY_AFTER:
+                continue
+            future = _inflight.get(url)
+            submitted = future is None
+            if submitted:
+                future = _executor.submit(_generate, url)
+                _inflight[url] = future
+        if submitted:  # outside the lock: the callback runs at once if it already finished
+            future.add_done_callback(lambda f, url=url: _done(url, f))
+        pending.append(future)
+    if wait > 0 and pending:
+        wait_futures(pending, timeout=wait)
+
+
+def evict_thumbnails(max_bytes: int = THUMB_CACHE_MAX_BYTES) -> int:
+    """Delete least recently used files until the store fits in 90% of max_bytes; returns files removed."""
+    entries = []
+    total = 0
+    for dirpath, _dirs, files in os.walk(THUMB_ROOT):
+        for name in files:
+            if name.startswith("."):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                st_ = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st_.st_mtime, st_.st_size, path))
+            total += st_.st_size
+    if total <= max_bytes:
+        return 0
+    removed = 0
+    target = int(max_bytes * 0.9)
+    for _mtime, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    print(f"🧹 Evicted {removed} thumbnail files")
+    return removed
@@ -0,0 +1,90 @@
+from __future__ import annotations
+import csv
+import io
+import mimetypes
+import os
+import tempfile
+import zipfile
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from components.adRecord import CURATED_FIELDS, get_ad_record
+from components.media_utils import iter_media
+
+MANIFEST_NAME = "manifest.csv"
+MANIFEST_FIELDS = ("file", "media_type", "media_url", "download_status") + CURATED_FIELDS
+
+# Already-compressed formats are stored as-is; deflating them only costs CPU
+_STORED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".mp4", ".mov", ".webm", ".avi"}
+
+
+def _media_extension(url: str, content_type: str, media_type: Optional[str]) -> str:
+    ext = os.path.splitext(urlparse(url).path)[1].lower()
+    if ext and len(ext) <= 5:
+        return ext
+    if content_type:
+        guessed = mimetypes.guess_extension(content_type)
+        if guessed:
+            return ".jpg" if guessed == ".jpe" else guessed
+    return ".mp4" if media_type == "video" else ".jpg"
+
+
+def _safe_name(value: Any) -> str:
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in str(value))[:64] or "ad"
+
+
+def write_media_zip(items: List[Dict[str, Any]], fileobj) -> Dict[str, int]:
+    """
+    Write every ad's creative plus a manifest.csv of its curated fields into a ZIP on `fileobj`.
+
+    Media is fetched concurrently but written one file at a time, so only the fetch window
+    is ever held in memory. Ads whose media can't be fetched stay in the manifest with
+    download_status "failed" (or "no media").
+
+    Returns:
+        {"files": files written, "failed": fetch failures, "missing": ads without media}
+    """
+    records = [get_ad_record(it) for it in items]
+    urls = [rec.media_url if rec.media_url and rec.media_url.startswith(("http://", "https://")) else None for rec in records]
+    stats = {"files": 0, "failed": 0, "missing": 0}
+    rows = []
+
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for i, (rec, (url, blob)) in enumerate(zip(records, iter_media(urls))):
+            row = {name: value for name, value in rec.as_fields().items() if name in CURATED_FIELDS}
+            row.update(file="", media_type=rec.media_type or "", media_url=url or "")
+            if url is None:
+                row["download_status"] = "no media"
+                stats["missing"] += 1
+            elif blob is None:
+                row["download_status"] = "failed"
+                stats["failed"] += 1
+            else:
+                ext = _media_extension(url, blob.content_type, rec.media_type)
+                name = f"media/{i + 1:04d}_{_safe_name(rec.ad_archive_id or 'ad')}{ext}"
+                zf.writestr(name, blob.data, compress_type=zipfile.ZIP_STORED if ext in _STORED_EXTENSIONS else zipfile.ZIP_DEFLATED)
+                row.update(file=name, download_status="ok")
+                stats["files"] += 1
+            rows.append(row)
+
+        with zf.open(MANIFEST_NAME, "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as text:
+            writer = csv.DictWriter(text, fieldnames=MANIFEST_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    return stats
+
+
+def build_media_zip(items: List[Dict[str, Any]]) -> bytes:
+    """
+    ZIP of all creatives for `items`, as bytes for st.download_button.
+
+    Streamlit keeps a download's data in memory as bytes (file handles are read in
+    full too), so the finished archive is held in RAM once: peak memory is the archive
+    size plus the fetch window. It is written to a temp file on disk and read back
+    once, so it is never held twice.
+    """
+    with tempfile.TemporaryFile(suffix=".zip") as tmp:
+        stats = write_media_zip(items, tmp)
+        print(f"📦 Creatives ZIP: {stats['files']} files, {stats['failed']} failed, {stats['missing']} without media")
+        tmp.seek(0)
+        return tmp.read()
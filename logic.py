@@ -6,16 +6,28 @@ from __future__ import annotations
 
 import os
 import json
+import time
+import zlib
 import sqlite3
+import struct
+import hashlib
+import threading
 from pathlib import Path
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
 from functools import lru_cache
 from urllib.parse import quote_plus
-from typing import Any, Optional, Dict, List, Union
+from typing import Any, Optional, Dict, Generator, Iterable, Iterator, List, Tuple, Union
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 
+from components.date_utils import parse_date
+from components.media_utils import MediaBlob, fetch_media, is_fetchable, prefetch_media, register_local_source
+from components.placeholder_utils import CARD_PLACEHOLDER_SIZE, placeholder_data_uri
+
 
 # =============================================================================
 # CONSTANTS / MAPPINGS
@@ -56,9 +68,37 @@ TEAM_TABLES = ["team1", "team2", "team3"]
 # SQLite path (same folder as this file)
 DB_PATH = Path(__file__).with_name("ads.db")
 
-# Table to store custom team names
+# Table that stored custom team names before the unified schema
 CUSTOM_TEAMS_TABLE = "custom_teams"
 
+# Connection settings for ads.db (shared by concurrent Streamlit sessions)
+DB_BUSY_TIMEOUT_MS = 10000
+DB_PRAGMAS = (
+    "synchronous = NORMAL",
+    "cache_size = -16000",      # ~16MB page cache per connection
+    "mmap_size = 268435456",    # 256MB
+    "temp_store = MEMORY",
+    "foreign_keys = ON",
+)
+
+# Persistent scrape-result cache (separate SQLite file next to ads.db)
+SCRAPE_CACHE_PATH = DB_PATH.with_name("scrape_cache.db")
+SCRAPE_CACHE_DEFAULT_TTL_SECONDS = 24 * 60 * 60
+SCRAPE_CACHE_DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Saved ads' creatives and avatars are mirrored into a content-addressed blob store
+# (ads_media/ next to ads.db) when MEDIA_MIRROR_ON_SAVE is set to 1 (off by default)
+MEDIA_MIRROR_ROLES = ("creative", "avatar")
+MEDIA_MIRROR_TIMEOUT = 30
+
+# Saved ads' raw_json is stored as a compressed BLOB (RAW_JSON_CODEC secret/env var:
+# "zlib", or "zstd" when the zstandard package is installed); old rows stay JSON text
+RAW_JSON_CODECS = ("zlib", "zstd")
+RAW_JSON_DEFAULT_CODEC = "zlib"
+RAW_JSON_LEVELS = {"zlib": 6, "zstd": 9}
+RAW_JSON_DICT_SIZE = 32 * 1024       # zlib can't use more than a 32KB preset dictionary
+RAW_JSON_DICT_SAMPLES = 2000
+
 
 # =============================================================================
 # APIFY IMPORT (lazy)
@@ -72,6 +112,15 @@ def _import_apify_client():
         return None, e
 
 
+@lru_cache(maxsize=1)
+def _import_zstandard():
+    try:
+        import zstandard  # type: ignore
+        return zstandard
+    except Exception:  # noqa: BLE001
+        return None
+
+
 # =============================================================================
 # TOKEN HANDLING
 # =============================================================================
@@ -82,6 +131,17 @@ def safe_get_streamlit_secret(key: str) -> str | None:
         return None
 
 
+def resolve_setting(key: str, default: Any = None) -> Any:
+    """Resolve a backend setting from Streamlit secrets, then environment variables."""
+    val = safe_get_streamlit_secret(key)
+    if val not in (None, ""):
+        return val
+    env_val = os.getenv(key)
+    if env_val not in (None, ""):
+        return env_val
+    return default
+
+
 def resolve_apify_token() -> str:
     """Resolve Apify token from backend sources only (secrets or environment variables)."""
     tok = safe_get_streamlit_secret("APIFY_TOKEN")
@@ -146,22 +206,45 @@ def build_fb_ads_library_url(*, country: str, keyword: str = "", ad_type: str =
 # =============================================================================
 # APIFY SCRAPE (cached)
 # =============================================================================
-@st.cache_data(show_spinner=False)
-def run_apify_scrape(token: str, url: str, count: int, active_status: str) -> list[dict]:
+APIFY_ACTOR_ID = "curious_coder/facebook-ads-library-scraper"
+
+# Streaming ingestion: dataset page size and how long to long-poll the run between pages
+STREAM_PAGE_SIZE = 50
+STREAM_POLL_SECONDS = 2
+
+APIFY_TERMINAL_STATUSES = ("SUCCEEDED", "FAILED", "TIMED-OUT", "ABORTED")
+
+# Batch mode: maximum number of actor runs in flight at once
+BATCH_MAX_CONCURRENCY = 5
+
+
+def _get_apify_client(token: str):
     ApifyClient, import_err = _import_apify_client()
     if import_err or ApifyClient is None:
         raise RuntimeError("apify-client not installed. Run: `pip install apify-client`.")
     if not token:
         raise ValueError("Missing Apify API token.")
+    return ApifyClient(token)
 
-    client = ApifyClient(token)
-    run_input = {
+
+def _build_run_input(url: str, count: int, active_status: str) -> dict:
+    return {
         "urls": [{"url": url, "method": "GET"}],
         "count": int(count),
         "scrapeAdDetails": True,
         "scrapePageAds.activeStatus": active_status,
         "period": "",
     }
+
+
+@st.cache_data(show_spinner=False)
+def run_apify_scrape(token: str, url: str, count: int, active_status: str) -> list[dict]:
+    cached = scrape_cache_get(url, count, active_status)
+    if cached is not None:
+        return cached
+
+    client = _get_apify_client(token)
+    run_input = _build_run_input(url, count, active_status)
     
     # Debug: Print the request being sent
     print(f"🔍 Sending request to Apify:")
@@ -171,7 +254,7 @@ def run_apify_scrape(token: str, url: str, count: int, active_status: str) -> li
     print(f"Full request: {run_input}")
     print(f"Request format matches example: {run_input.get('count') == count and run_input.get('scrapeAdDetails') == True and 'period' in run_input}")
     
-    run = client.actor("curious_coder/facebook-ads-library-scraper").call(run_input=run_input)
+    run = client.actor(APIFY_ACTOR_ID).call(run_input=run_input)
     ds_id = run.get("defaultDatasetId")
     if not ds_id:
         print("❌ No dataset ID returned from Apify")
@@ -180,31 +263,527 @@ def run_apify_scrape(token: str, url: str, count: int, active_status: str) -> li
     print(f"✅ Dataset ID: {ds_id}")
     items = list(client.dataset(ds_id).iterate_items())
     print(f"📊 Retrieved {len(items)} items from Apify")
+    if items:
+        scrape_cache_put(url, count, active_status, items)
     return items
 
 
+def iter_apify_scrape_pages(
+    token: str,
+    url: str,
+    count: int,
+    active_status: str,
+    page_size: int = STREAM_PAGE_SIZE,
+) -> Generator[List[Dict[str, Any]], None, Optional[str]]:
+    """
+    Streaming variant of run_apify_scrape: start the actor run and yield dataset
+    pages while the run is still in progress.
+    
+    Only one page is held at a time, so the caller decides how much to keep.
+    If the consumer stops iterating before the run finishes, the run is aborted
+    so no further Apify credits are spent.
+    
+    Args:
+        token: Apify API token
+        url: Facebook Ad Library URL to scrape
+        count: Number of ads requested from the actor
+        active_status: Value for scrapePageAds.activeStatus
+        page_size: Maximum number of items per yielded page
+        
+    Yields:
+        list[dict]: The next page of raw Apify items, in dataset order
+        
+    Returns:
+        The run's final status (StopIteration.value); anything but "SUCCEEDED"
+        means the pages streamed so far are a partial result
+        
+    Raises:
+        RuntimeError: If the run ends unsuccessfully without producing any items
+    """
+    client = _get_apify_client(token)
+    run_input = _build_run_input(url, count, active_status)
+    print(f"🔍 Starting streaming Apify run for URL: {url} (count={count}, page_size={page_size})")
+
+    run = client.actor(APIFY_ACTOR_ID).start(run_input=run_input)
+    run_id = run.get("id")
+    ds_id = run.get("defaultDatasetId")
+    if not run_id or not ds_id:
+        print("❌ No run/dataset ID returned from Apify")
+        return
+
+    run_client = client.run(run_id)
+    dataset = client.dataset(ds_id)
+    status = run.get("status")
+    offset = 0
+    try:
+        while True:
+            finished = status in APIFY_TERMINAL_STATUSES
+            # Drain everything the actor has pushed so far, one page at a time
+            while True:
+                page = dataset.list_items(offset=offset, limit=page_size)
+                if not page.items:
+                    break
+                offset += len(page.items)
+                yield page.items
+                if len(page.items) < page_size:
+                    break
+            if finished:
+                break
+            # Long-poll the run; returns early as soon as it finishes
+            run = run_client.wait_for_finish(wait_secs=STREAM_POLL_SECONDS) or run_client.get() or {}
+            status = run.get("status")
+    finally:
+        if status not in APIFY_TERMINAL_STATUSES:
+            print(f"⏹️ Stream closed early, aborting Apify run {run_id}")
+            try:
+                run_client.abort()
+            except Exception as e:  # noqa: BLE001
+                print(f"Error aborting Apify run {run_id}: {e}")
+
+    print(f"📊 Streamed {offset} items from Apify (run status: {status})")
+    if status != "SUCCEEDED" and offset == 0:
+        raise RuntimeError(f"Apify run {run_id} finished with status {status}")
+    return status
+
+
+# =============================================================================
+# APIFY BATCH SCRAPE (concurrent fan-out)
+# =============================================================================
+def split_batch_terms(raw: str) -> List[str]:
+    """Split a comma/newline separated list of keywords or page IDs, dropping blanks and duplicates."""
+    terms: List[str] = []
+    for part in raw.replace("\n", ",").split(","):
+        part = part.strip()
+        if part and part not in terms:
+            terms.append(part)
+    return terms
+
+
+def _start_and_wait_run(client, url: str, count: int, active_status: str) -> tuple[str, str, Optional[str]]:
+    """Start an actor run, block until it finishes, and return (run_id, dataset_id, status)."""
+    run = client.actor(APIFY_ACTOR_ID).start(run_input=_build_run_input(url, count, active_status))
+    run_id = run.get("id")
+    ds_id = run.get("defaultDatasetId")
+    if not run_id or not ds_id:
+        raise RuntimeError("No run/dataset ID returned from Apify")
+    run = client.run(run_id).wait_for_finish() or {}
+    return run_id, ds_id, run.get("status")
+
+
+def _scrape_one_for_batch(token: str, url: str, count: int, active_status: str) -> tuple[List[Dict[str, Any]], Optional[str]]:
+    """(items, final run status) for one batch URL; cache hits count as "SUCCEEDED"."""
+    cached = scrape_cache_get(url, count, active_status)
+    if cached is not None:
+        return cached, "SUCCEEDED"
+
+    # One client per worker thread; each run is started, then waited on independently
+    client = _get_apify_client(token)
+    run_id, ds_id, status = _start_and_wait_run(client, url, count, active_status)
+    items = list(client.dataset(ds_id).iterate_items())
+    if status != "SUCCEEDED" and not items:
+        raise RuntimeError(f"Apify run {run_id} finished with status {status}")
+    # A run that stopped partway is used, but never cached as the query's full result
+    if items and status == "SUCCEEDED":
+        scrape_cache_put(url, count, active_status, items)
+    return items, status
+
+
+def merge_ads_by_archive_id(batches: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Concatenate result lists, keeping the first occurrence of each ad_archive_id."""
+    merged: List[Dict[str, Any]] = []
+    seen: set[str] = set()
+    for items in batches:
+        for it in items:
+            ad_id = it.get("ad_archive_id") or it.get("adId")
+            if ad_id:
+                ad_id = str(ad_id)
+                if ad_id in seen:
+                    continue
+                seen.add(ad_id)
+            merged.append(it)
+    return merged
+
+
+def run_apify_batch(
+    token: str,
+    urls: List[str],
+    count: int,
+    active_status: str,
+    max_concurrency: int = BATCH_MAX_CONCURRENCY,
+) -> tuple[List[Dict[str, Any]], Dict[str, str], Dict[str, str]]:
+    """
+    Run one actor per URL concurrently and merge the datasets.
+    
+    At most max_concurrency runs are in flight at once, so the batch takes
+    roughly as long as its slowest run rather than the sum of all runs.
+    A failing URL does not fail the batch; its error is reported instead. A URL whose
+    run stopped partway (failed, timed out, aborted) is merged but reported as partial.
+    
+    Args:
+        token: Apify API token
+        urls: Facebook Ad Library URLs to scrape
+        count: Number of ads requested per URL
+        active_status: Value for scrapePageAds.activeStatus
+        max_concurrency: Upper bound on simultaneous actor runs
+        
+    Returns:
+        tuple: (merged items de-duplicated by ad_archive_id in URL order, {url: error message},
+            {url: final run status} for partial results)
+    """
+    if not urls:
+        return [], {}, {}
+    _get_apify_client(token)  # fail fast on a missing client/token
+
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    errors: Dict[str, str] = {}
+    partial: Dict[str, str] = {}
+    print(f"🔍 Starting Apify batch: {len(urls)} URLs, concurrency={max_concurrency}")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(urls)))) as pool:
+        futures = {pool.submit(_scrape_one_for_batch, token, u, count, active_status): u for u in urls}
+        for fut in as_completed(futures):
+            u = futures[fut]
+            try:
+                results[u], status = fut.result()
+                if status != "SUCCEEDED":
+                    partial[u] = str(status)
+                print(f"✅ Batch run done ({len(results[u])} items, status {status}): {u}")
+            except Exception as e:  # noqa: BLE001
+                errors[u] = str(e)
+                print(f"❌ Batch run failed for {u}: {e}")
+
+    merged = merge_ads_by_archive_id([results[u] for u in urls if u in results])
+    print(f"📊 Batch merged {sum(len(v) for v in results.values())} items into {len(merged)} unique ads")
+    return merged, errors, partial
+
+
+# =============================================================================
+# DELTA REFRESH (fetch only new / changed ads for a known query)
+# =============================================================================
+# Light projection used to diff a fresh dataset against the stored snapshot
+DELTA_FIELDS = ["ad_archive_id", "start_date", "end_date", "is_active"]
+DELTA_LIST_PAGE_SIZE = 1000
+
+
+def _delta_signature(item: dict) -> list:
+    return [item.get("start_date"), item.get("end_date"), item.get("is_active")]
+
+
+def load_query_snapshot(url: str, count: int, active_status: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Items last ingested for a query (its scrape cache entry), or None.
+
+    The scrape cache doubles as the delta-refresh baseline, so there is one stored copy
+    per query under the cache's byte budget. Unlike scrape_cache_get, an entry past its
+    TTL still counts: the refresh re-checks every ad anyway, and expired entries are only
+    evicted when the cache is over budget.
+    """
+    key = _scrape_cache_key(url, count, active_status)
+    try:
+        conn = _scrape_cache_connect()
+        try:
+            row = conn.execute("SELECT payload FROM scrape_cache WHERE cache_key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+        return json.loads(zlib.decompress(row[0]).decode("utf-8")) if row else None
+    except Exception as e:  # noqa: BLE001
+        print(f"Query snapshot read failed: {e}")
+        return None
+
+
+def _offset_ranges(offsets: List[int]) -> List[tuple[int, int]]:
+    """Collapse sorted dataset offsets into (offset, limit) ranges of consecutive rows."""
+    ranges: List[tuple[int, int]] = []
+    for off in offsets:
+        if ranges and ranges[-1][0] + ranges[-1][1] == off:
+            ranges[-1] = (ranges[-1][0], ranges[-1][1] + 1)
+        else:
+            ranges.append((off, 1))
+    return ranges
+
+
+def refresh_apify_scrape(
+    token: str,
+    url: str,
+    count: int,
+    active_status: str,
+    base_items: Optional[List[Dict[str, Any]]] = None,
+) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Re-run a previous search but download full items only for new or changed ads.
+    
+    The fresh dataset is first listed with a light projection (DELTA_FIELDS).
+    That listing is diffed against the stored snapshot for the query. Full
+    items are then fetched only at the dataset offsets of ads that are new or
+    whose start/end date or active flag changed. Unchanged ads are reused from
+    the snapshot and ads that disappeared are dropped.
+    
+    Args:
+        token: Apify API token
+        url: Facebook Ad Library URL to scrape
+        count: Number of ads requested
+        active_status: Value for scrapePageAds.activeStatus
+        base_items: Fallback baseline when the query has no scrape cache entry
+        
+    Returns:
+        tuple: (merged items in fresh dataset order, report dict with
+        added / removed / status_changed / changed id lists and transfer counts)
+    """
+    baseline = load_query_snapshot(url, count, active_status)
+    if baseline is None:
+        baseline = base_items or []
+    stored = {str(it.get("ad_archive_id")): it for it in baseline if it.get("ad_archive_id")}
+
+    client = _get_apify_client(token)
+    run_id, ds_id, status = _start_and_wait_run(client, url, count, active_status)
+    dataset = client.dataset(ds_id)
+
+    # Pass 1: light listing of ids + dates + active flag
+    light: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        page = dataset.list_items(offset=offset, limit=DELTA_LIST_PAGE_SIZE, fields=DELTA_FIELDS)
+        if not page.items:
+            break
+        light.extend(page.items)
+        offset += len(page.items)
+        if len(page.items) < DELTA_LIST_PAGE_SIZE:
+            break
+    if status != "SUCCEEDED" and not light:
+        raise RuntimeError(f"Apify run {run_id} finished with status {status}")
+
+    added: List[str] = []
+    changed: List[str] = []
+    status_changed: List[str] = []
+    need_offsets: List[int] = []
+    fresh_ids: List[Optional[str]] = []
+    for off, row in enumerate(light):
+        ad_id = str(row["ad_archive_id"]) if row.get("ad_archive_id") else None
+        fresh_ids.append(ad_id)
+        old = stored.get(ad_id) if ad_id else None
+        if old is None:
+            if ad_id:
+                added.append(ad_id)
+            need_offsets.append(off)
+        elif _delta_signature(old) != _delta_signature(row):
+            changed.append(ad_id)
+            if old.get("is_active") != row.get("is_active") or old.get("end_date") != row.get("end_date"):
+                status_changed.append(ad_id)
+            need_offsets.append(off)
+
+    # Pass 2: full items only where needed, in contiguous offset ranges
+    full_by_offset: Dict[int, Dict[str, Any]] = {}
+    for start, limit in _offset_ranges(need_offsets):
+        page = dataset.list_items(offset=start, limit=limit)
+        for i, it in enumerate(page.items):
+            full_by_offset[start + i] = it
+
+    merged: List[Dict[str, Any]] = []
+    for off, ad_id in enumerate(fresh_ids):
+        it = full_by_offset.get(off) or (stored.get(ad_id) if ad_id else None)
+        if it is not None:
+            merged.append(it)
+    merged = merge_ads_by_archive_id([merged])
+
+    fresh_set = {i for i in fresh_ids if i}
+    removed = [ad_id for ad_id in stored if ad_id not in fresh_set]
+    report = {
+        "added": added,
+        "removed": removed,
+        "status_changed": status_changed,
+        "changed": changed,
+        "full_items_fetched": len(full_by_offset),
+        "total": len(merged),
+    }
+    print(
+        f"🔄 Delta refresh: +{len(added)} / -{len(removed)} / ~{len(changed)} "
+        f"({len(full_by_offset)} of {len(light)} full items fetched)"
+    )
+
+    if merged:
+        scrape_cache_put(url, count, active_status, merged)
+    return merged, report
+
+
+# =============================================================================
+# PERSISTENT SCRAPE CACHE (SQLite, zlib-compressed payloads)
+# =============================================================================
+SCRAPE_CACHE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS scrape_cache (
+    cache_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    active_status TEXT NOT NULL,
+    item_count INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scrape_cache_last_access ON scrape_cache (last_access);
+DROP TABLE IF EXISTS query_snapshots;
+"""
+
+
+def scrape_cache_ttl_seconds() -> int:
+    """TTL for cached scrape results (SCRAPE_CACHE_TTL_SECONDS secret/env var, 0 disables the cache)."""
+    try:
+        return int(resolve_setting("SCRAPE_CACHE_TTL_SECONDS", SCRAPE_CACHE_DEFAULT_TTL_SECONDS))
+    except (TypeError, ValueError):
+        return SCRAPE_CACHE_DEFAULT_TTL_SECONDS
+
+
+def scrape_cache_max_bytes() -> int:
+    """Upper bound on total compressed payload bytes (SCRAPE_CACHE_MAX_BYTES secret/env var)."""
+    try:
+        return int(resolve_setting("SCRAPE_CACHE_MAX_BYTES", SCRAPE_CACHE_DEFAULT_MAX_BYTES))
+    except (TypeError, ValueError):
+        return SCRAPE_CACHE_DEFAULT_MAX_BYTES
+
+
+def _scrape_cache_key(url: str, count: int, active_status: str) -> str:
+    raw = json.dumps([url, int(count), active_status], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _scrape_cache_connect() -> sqlite3.Connection:
+    # WAL lets several app replicas sharing the disk read while one writes
+    conn = sqlite3.connect(SCRAPE_CACHE_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCRAPE_CACHE_SCHEMA_SQL)
+    return conn
+
+
+def scrape_cache_get(url: str, count: int, active_status: str, ttl_seconds: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Return cached scrape items for (url, count, active_status), or None on a miss.
+    
+    Args:
+        url: Facebook Ad Library URL that was scraped
+        count: Number of ads requested
+        active_status: Value for scrapePageAds.activeStatus
+        ttl_seconds: Override for the configured TTL; entries older than this are misses
+        
+    Returns:
+        list[dict] | None: The cached raw Apify items, or None if absent/expired
+    """
+    ttl = scrape_cache_ttl_seconds() if ttl_seconds is None else ttl_seconds
+    if ttl <= 0:
+        return None
+
+    key = _scrape_cache_key(url, count, active_status)
+    now = time.time()
+    try:
+        conn = _scrape_cache_connect()
+        try:
+            row = conn.execute(
+                "SELECT payload, created_at FROM scrape_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            payload, created_at = row
+            if now - created_at > ttl:
+                # A miss, but the entry stays as the query's refresh baseline
+                return None
+            conn.execute("UPDATE scrape_cache SET last_access = ? WHERE cache_key = ?", (now, key))
+            conn.commit()
+        finally:
+            conn.close()
+        items = json.loads(zlib.decompress(payload).decode("utf-8"))
+        print(f"💾 Scrape cache hit for {url} ({len(items)} items)")
+        return items
+    except Exception as e:  # noqa: BLE001
+        print(f"Scrape cache read failed: {e}")
+        return None
+
+
+def scrape_cache_put(url: str, count: int, active_status: str, items: List[Dict[str, Any]]) -> None:
+    """Store scrape items compressed, then evict least-recently-used entries over the byte budget."""
+    if scrape_cache_ttl_seconds() <= 0:
+        return
+
+    key = _scrape_cache_key(url, count, active_status)
+    # Compress as the JSON is encoded, so the uncompressed text is never held whole
+    compressor = zlib.compressobj(6)
+    chunks = [
+        compressor.compress(chunk.encode("utf-8"))
+        for chunk in json.JSONEncoder(ensure_ascii=False).iterencode(items)
+    ]
+    chunks.append(compressor.flush())
+    payload = b"".join(chunks)
+    now = time.time()
+    try:
+        conn = _scrape_cache_connect()
+        try:
+            with conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO scrape_cache
+                        (cache_key, url, count, active_status, item_count, payload, size_bytes, created_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (key, url, int(count), active_status, len(items), payload, len(payload), now, now),
+                )
+                _scrape_cache_evict(conn, scrape_cache_max_bytes())
+        finally:
+            conn.close()
+    except Exception as e:  # noqa: BLE001
+        print(f"Scrape cache write failed: {e}")
+
+
+def _scrape_cache_evict(conn: sqlite3.Connection, max_bytes: int) -> None:
+    # Expired entries are kept as refresh baselines (load_query_snapshot) while the
+    # cache fits; over budget, drop them first, then LRU entries until the total fits
+    total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM scrape_cache").fetchone()[0]
+    if total <= max_bytes:
+        return
+    evicted = 0
+    expired_before = time.time() - scrape_cache_ttl_seconds()
+    for key, size in conn.execute(
+        "SELECT cache_key, size_bytes FROM scrape_cache ORDER BY created_at >= ?, last_access", (expired_before,)
+    ).fetchall():
+        if total <= max_bytes:
+            break
+        conn.execute("DELETE FROM scrape_cache WHERE cache_key = ?", (key,))
+        total -= size
+        evicted += 1
+    print(f"🧹 Evicted {evicted} scrape cache entries (now {total} bytes)")
+
+
+def scrape_cache_clear() -> None:
+    """Remove every cached scrape result."""
+    conn = _scrape_cache_connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM scrape_cache")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
 # =============================================================================
 # DATE HELPERS
 # =============================================================================
 def parse_date_maybe(s: Any):
-    if not s:
+    """Parse a date string or epoch into a datetime, or None (cached, see components.date_utils)."""
+    return parse_date(s)
+
+
+def _coerce_epoch_or_date(val):
+    """Coerce an epoch (int / digit string) or date string to an ISO date string (epoch OK)."""
+    if val in (None, "", 0, "0"):
         return None
-    for fmt in (
-        "%Y-%m-%d",
-        "%Y-%m-%dT%H:%M:%S%z",
-        "%Y-%m-%dT%H:%M:%S.%f%z",
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%d %H:%M:%S",
-    ):
-        try:
-            return datetime.strptime(str(s), fmt)
-        except Exception:  # noqa: BLE001
-            continue
-    try:  # epoch?
-        if str(s).isdigit():
-            return datetime.fromtimestamp(int(s), tz=timezone.utc)
+    try:
+        if isinstance(val, (int, float)) or str(val).isdigit():
+            dt = datetime.fromtimestamp(int(val), tz=timezone.utc)
+            return dt.date().isoformat()
     except Exception:  # noqa: BLE001
         pass
+    dt = parse_date_maybe(val)
+    if dt:
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.date().isoformat()
     return None
 
 
@@ -302,6 +881,75 @@ def extract_primary_media(item: dict):
     return None, None
 
 
+# Shown when an ad has no usable creative (inline SVG, no network request)
+MEDIA_PLACEHOLDER_URL = placeholder_data_uri(*CARD_PLACEHOLDER_SIZE)
+
+
+def extract_best_media(item: dict, fields: Optional[dict] = None):
+    """
+    Pick the best creative for a card: snapshot-level image/video first, then the
+    images/videos lists, then extract_primary_media, then a placeholder.
+    Pass already-extracted curated fields to avoid re-extracting them.
+    """
+    snap = _get_snapshot_dict(item)
+    
+    # Priority 1: Check for original_image_url first (as requested)
+    if snap.get("original_image_url"):
+        return "image", snap.get("original_image_url")
+    
+    # Priority 2: Check for video_hd_url in root
+    if snap.get("video_hd_url"):
+        return "video", snap.get("video_hd_url")
+    
+    # Priority 3: Check for original_picture_url in root
+    if snap.get("original_picture_url"):
+        return "image", snap.get("original_picture_url")
+    
+    # Priority 4: Check for original_image_url in extracted fields
+    original_image_url = fields.get("original_image_url") if fields is not None else get_original_image_url(item)
+    if original_image_url:
+        return "image", original_image_url
+    
+    # Priority 5: Check for video_hd_url in videos list
+    videos = snap.get("videos")
+    if isinstance(videos, list):
+        for v in videos:
+            if isinstance(v, dict) and v.get("video_hd_url"):
+                return "video", v.get("video_hd_url")
+    
+    # Priority 6: Check for original_picture_url in images list
+    images = snap.get("images")
+    if isinstance(images, list):
+        for im in images:
+            if isinstance(im, dict) and im.get("original_picture_url"):
+                return "image", im.get("original_picture_url")
+    
+    # Priority 7: Check for original_image_url in images list
+    if images and isinstance(images, list):
+        for im in images:
+            if isinstance(im, dict) and im.get("original_image_url"):
+                return "image", im.get("original_image_url")
+    
+    # Priority 8: Other fallbacks
+    if snap.get("video_url"):
+        return "video", snap.get("video_url")
+    
+    if images and isinstance(images, list):
+        for im in images:
+            if isinstance(im, dict):
+                for k in ("url", "src"):
+                    if im.get(k):
+                        return "image", im.get(k)
+    
+    # Priority 9: Fallback to extract_primary_media
+    media_type, media_url = extract_primary_media(item)
+    if media_url:
+        return media_type, media_url
+    
+    # Priority 10: Final fallback to placeholder
+    return "image", MEDIA_PLACEHOLDER_URL
+
+
 # =============================================================================
 # TEXT UTIL
 # =============================================================================
@@ -315,10 +963,28 @@ def summarize_text(txt: str, length: int = 160) -> str:
 # =============================================================================
 # DB SCHEMA
 # =============================================================================
+# Curated ad columns stored once per ad in the `ads` table
+AD_COLUMNS = [
+    "ad_archive_id", "categories", "collation_count", "collation_id",
+    "start_date", "end_date", "entity_type", "is_active",
+    "page_id", "page_name", "cta_text", "cta_type",
+    "link_url", "page_entity_type", "page_profile_picture_url",
+    "page_profile_uri", "state_media_run_label", "total_active_time",
+    "original_image_url", "raw_json",
+]
+
+# Bumped whenever init_db has a migration to run (stored in PRAGMA user_version)
+DB_SCHEMA_VERSION = 4
+
+# Columns a repeated save of an ad refreshes (the rest keep their first-saved value)
+AD_REFRESH_COLUMNS = ["is_active", "end_date", "total_active_time", "raw_json"]
+
+# One row per ad, one row per team, and a membership row per (team, save);
+# media_blobs/ad_media index the saved ads' mirrored creatives and avatars, and
+# raw_json_dicts holds the shared compression dictionaries raw_json BLOBs refer to
 SCHEMA_SQL = """
-CREATE TABLE IF NOT EXISTS {table_name} (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    ad_archive_id TEXT,
+CREATE TABLE IF NOT EXISTS ads (
+    ad_archive_id TEXT PRIMARY KEY NOT NULL,
     categories TEXT,
     collation_count TEXT,
     collation_id TEXT,
@@ -338,45 +1004,634 @@ CREATE TABLE IF NOT EXISTS {table_name} (
     total_active_time INTEGER,
     original_image_url TEXT,
     raw_json TEXT,
-    saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    raw_version INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
-"""
-
-CUSTOM_TEAMS_SCHEMA_SQL = """
-CREATE TABLE IF NOT EXISTS custom_teams (
+CREATE TABLE IF NOT EXISTS teams (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     team_name TEXT UNIQUE NOT NULL,
-    table_name TEXT UNIQUE NOT NULL,
+    slug TEXT UNIQUE NOT NULL,
+    is_default INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS team_ads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    team_id INTEGER NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+    ad_archive_id TEXT NOT NULL REFERENCES ads(ad_archive_id),
+    saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_team_ads_team_saved ON team_ads(team_id, saved_at, id);
+CREATE INDEX IF NOT EXISTS idx_team_ads_ad ON team_ads(ad_archive_id);
+CREATE TABLE IF NOT EXISTS media_blobs (
+    sha256 TEXT PRIMARY KEY NOT NULL,
+    content_type TEXT,
+    size INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS ad_media (
+    ad_archive_id TEXT NOT NULL REFERENCES ads(ad_archive_id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    sha256 TEXT NOT NULL REFERENCES media_blobs(sha256),
+    PRIMARY KEY (ad_archive_id, role)
+);
+CREATE INDEX IF NOT EXISTS idx_ad_media_url ON ad_media(source_url);
+CREATE INDEX IF NOT EXISTS idx_ad_media_sha ON ad_media(sha256);
+CREATE TABLE IF NOT EXISTS raw_json_dicts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    codec TEXT NOT NULL,
+    data BLOB NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 """
 
+# One membership per (team, ad): saves are upserts. Created by init_db after the
+# duplicate memberships older databases may hold have been collapsed.
+TEAM_ADS_UNIQUE_INDEX_SQL = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_team_ads_team_ad ON team_ads(team_id, ad_archive_id)"
+)
+
+# Per-team table template used before the unified schema (read only by the migration)
+LEGACY_TEAM_TABLE_COLUMNS = AD_COLUMNS + ["saved_at"]
+
+
+_db_local = threading.local()
+
 
 def _connect() -> sqlite3.Connection:
-    return sqlite3.connect(DB_PATH)
+    """
+    Return this thread's connection to DB_PATH, opening it on first use.
 
+    Connections are kept per thread and configured once: WAL journal, busy timeout and
+    the DB_PRAGMAS below. Streamlit starts a new script thread for every rerun, so a
+    connection is reused by all queries of one run (and by long-lived worker threads),
+    not across reruns; it is closed when its thread ends. They are in autocommit mode;
+    group writes with _transaction(). Callers must not close them.
+    """
+    conn = getattr(_db_local, "conn", None)
+    if conn is not None and _db_local.path == DB_PATH:
+        return conn
+    if conn is not None:
+        conn.close()
 
-def init_db() -> None:
+    conn = sqlite3.connect(DB_PATH, timeout=DB_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    conn.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    for pragma in DB_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}")
+    _db_local.conn = conn
+    _db_local.path = DB_PATH
+    return conn
+
+
+@contextmanager
+def _transaction(write: bool = False) -> Iterator[sqlite3.Cursor]:
+    """
+    Run a block in one transaction on the thread's pooled connection.
+
+    Args:
+        write: Take the write lock up front (BEGIN IMMEDIATE) so concurrent sessions
+            wait on busy_timeout instead of failing with "database is locked" mid-way
+
+    Yields:
+        A cursor; the transaction commits on success and rolls back on error.
+        Nested calls join the outer transaction.
+    """
     conn = _connect()
+    if conn.in_transaction:
+        yield conn.cursor()
+        return
+    conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
     try:
-        cur = conn.cursor()
+        yield conn.cursor()
+        conn.execute("COMMIT")
+    except BaseException:
+        # Also when COMMIT itself fails (e.g. still locked after busy_timeout): never leave
+        # the pooled connection inside a transaction later calls would silently join
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+
+def close_db_connection() -> None:
+    """Close this thread's pooled connection (it is reopened on next use)."""
+    conn = getattr(_db_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _db_local.conn = None
+
+
+def _team_slug(team_name: str) -> str:
+    """Normalized team key; two names with the same slug count as the same team."""
+    return team_name.lower().replace(" ", "_").replace("-", "_")
+
+
+def _table_exists(cur: sqlite3.Cursor, name: str) -> bool:
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,))
+    return cur.fetchone() is not None
+
+
+# =============================================================================
+# RAW_JSON CODEC (compressed BLOBs with a format header)
+# =============================================================================
+# raw_json is either legacy JSON text, or a BLOB of: codec id (1 byte), id of the
+# raw_json_dicts row it was compressed with (4 bytes, 0 = none), compressed JSON
+_RAW_JSON_CODEC_IDS = {"zlib": 1, "zstd": 2}
+_RAW_JSON_CODEC_NAMES = {v: k for k, v in _RAW_JSON_CODEC_IDS.items()}
+_RAW_JSON_HEADER = struct.Struct(">BI")
+
+_raw_json_dicts: Dict[tuple, bytes] = {}   # (DB_PATH, dict id) -> dictionary bytes
+_raw_json_dicts_lock = threading.Lock()
+
+
+def raw_json_codec() -> str:
+    """Codec for newly written raw_json; zstd falls back to zlib when zstandard isn't installed."""
+    codec = str(resolve_setting("RAW_JSON_CODEC", RAW_JSON_DEFAULT_CODEC)).strip().lower()
+    if codec == "zstd" and _import_zstandard() is None:
+        return "zlib"
+    return codec if codec in RAW_JSON_CODECS else RAW_JSON_DEFAULT_CODEC
+
+
+def _raw_json_dict(dict_id: int) -> Optional[bytes]:
+    """Dictionary bytes of a raw_json_dicts row (immutable, so cached per process)."""
+    key = (DB_PATH, dict_id)
+    with _raw_json_dicts_lock:
+        data = _raw_json_dicts.get(key)
+    if data is None:
+        with _transaction() as cur:
+            row = cur.execute("SELECT data FROM raw_json_dicts WHERE id = ?", (dict_id,)).fetchone()
+        if row is None:
+            return None
+        data = bytes(row[0])
+        with _raw_json_dicts_lock:
+            _raw_json_dicts[key] = data
+    return data
+
+
+def _latest_raw_json_dict(codec: str) -> int:
+    """Id of the newest dictionary trained for `codec` (0 when there is none)."""
+    try:
+        with _transaction() as cur:
+            row = cur.execute("SELECT MAX(id) FROM raw_json_dicts WHERE codec = ?", (codec,)).fetchone()
+    except sqlite3.OperationalError:  # schema not created yet
+        return 0
+    return row[0] or 0
+
+
+def encode_raw_json(text: Optional[str], codec: Optional[str] = None, dict_id: Optional[int] = None) -> Optional[bytes]:
+    """
+    Compress serialized raw_json for storage.
+
+    Args:
+        text: json.dumps of the raw item
+        codec: One of RAW_JSON_CODECS (default: raw_json_codec())
+        dict_id: raw_json_dicts row to compress with (default: the newest one for the codec)
+    """
+    if text is None:
+        return None
+    codec = codec or raw_json_codec()
+    if dict_id is None:
+        dict_id = _latest_raw_json_dict(codec)
+    zdict = _raw_json_dict(dict_id) if dict_id else None
+    if zdict is None:
+        dict_id = 0
+    data = text.encode("utf-8")
+    if codec == "zstd":
+        zstd = _import_zstandard()
+        dict_data = zstd.ZstdCompressionDict(zdict) if zdict else None
+        body = zstd.ZstdCompressor(level=RAW_JSON_LEVELS["zstd"], dict_data=dict_data).compress(data)
+    else:
+        comp = zlib.compressobj(RAW_JSON_LEVELS["zlib"], zdict=zdict) if zdict else zlib.compressobj(RAW_JSON_LEVELS["zlib"])
+        body = comp.compress(data) + comp.flush()
+    return _RAW_JSON_HEADER.pack(_RAW_JSON_CODEC_IDS[codec], dict_id) + body
+
+
+def raw_json_format(value: Any) -> Optional[tuple]:
+    """(codec, dict id) of a stored raw_json; ("text", 0) for legacy rows, None when empty."""
+    if value is None:
+        return None
+    if isinstance(value, str) or bytes(value[:1]) == b"{":
+        return ("text", 0)
+    codec_id, dict_id = _RAW_JSON_HEADER.unpack_from(value)
+    return (_RAW_JSON_CODEC_NAMES.get(codec_id, "unknown"), dict_id)
+
+
+def _raw_json_text(value: Any) -> str:
+    """Stored raw_json (text or compressed BLOB) -> JSON text."""
+    codec, dict_id = raw_json_format(value)
+    if codec == "text":
+        return value if isinstance(value, str) else bytes(value).decode("utf-8")
+    body = bytes(value[_RAW_JSON_HEADER.size:])
+    zdict = _raw_json_dict(dict_id) if dict_id else None
+    if dict_id and zdict is None:
+        raise ValueError(f"raw_json dictionary {dict_id} is missing")
+    if codec == "zstd":
+        zstd = _import_zstandard()
+        if zstd is None:
+            raise ValueError("raw_json is zstd-compressed but zstandard is not installed")
+        dict_data = zstd.ZstdCompressionDict(zdict) if zdict else None
+        return zstd.ZstdDecompressor(dict_data=dict_data).decompress(body).decode("utf-8")
+    if codec == "zlib":
+        decomp = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+        return (decomp.decompress(body) + decomp.flush()).decode("utf-8")
+    raise ValueError(f"unknown raw_json format {codec}")
+
+
+def decode_raw_json(value: Any) -> Optional[Dict[str, Any]]:
+    """Stored raw_json (any format) -> the original Apify item (None when absent or unreadable)."""
+    return decode_raw_json_sized(value)[0]
+
+
+def decode_raw_json_sized(value: Any) -> Tuple[Optional[Dict[str, Any]], int]:
+    """decode_raw_json plus the length of the decoded JSON text (0 when nothing was decoded)."""
+    if value is None or isinstance(value, dict):
+        return value, 0
+    try:
+        text = _raw_json_text(value)
+        item = json.loads(text)
+    except (TypeError, ValueError, struct.error, zlib.error) as e:
+        print(f"⚠️ Could not decode raw_json: {e}")
+        return None, 0
+    return (item, len(text)) if isinstance(item, dict) else (None, 0)
+
+
+def _zlib_dictionary(samples: List[bytes]) -> bytes:
+    """
+    Preset dictionary for zlib: typical snapshots concatenated, the most common ones
+    last (zlib matches against the end of the dictionary first).
+    """
+    typical = sorted(samples, key=len)[len(samples) // 4: 3 * len(samples) // 4] or samples
+    out = b""
+    for sample in typical:
+        if len(out) >= RAW_JSON_DICT_SIZE:
+            break
+        out = sample + out
+    return out[-RAW_JSON_DICT_SIZE:]
+
+
+def train_raw_json_dictionary(codec: Optional[str] = None, max_samples: int = RAW_JSON_DICT_SAMPLES) -> int:
+    """
+    Build a shared compression dictionary from stored ads and save it to raw_json_dicts.
+
+    New rows (and compact_raw_json) use the newest dictionary of their codec.
+
+    Returns:
+        The dictionary id, or 0 when there are too few ads to train on
+    """
+    codec = codec or raw_json_codec()
+    with _transaction() as cur:
+        cur.execute("SELECT raw_json FROM ads WHERE raw_json IS NOT NULL ORDER BY RANDOM() LIMIT ?", (max_samples,))
+        samples = [_raw_json_text(r[0]).encode("utf-8") for r in cur.fetchall()]
+    if len(samples) < 8:
+        return 0
+    if codec == "zstd":
+        zstd = _import_zstandard()
+        data = zstd.train_dictionary(RAW_JSON_DICT_SIZE * 4, samples).as_bytes()
+    else:
+        data = _zlib_dictionary(samples)
+    with _transaction(write=True) as cur:
+        cur.execute("INSERT INTO raw_json_dicts (codec, data) VALUES (?, ?)", (codec, data))
+        dict_id = cur.lastrowid
+    print(f"📚 Trained a {len(data)} byte {codec} dictionary on {len(samples)} ads (id {dict_id})")
+    return dict_id
+
+
+def compact_raw_json(codec: Optional[str] = None, train_dict: bool = False, vacuum: bool = True, batch: int = 500) -> Dict[str, int]:
+    """
+    Rewrite every stored raw_json in the current format (one-shot, for existing databases).
+
+    Rows are re-encoded a batch per write transaction, so the app can keep running.
+    VACUUM afterwards returns the freed pages to the filesystem.
+
+    Returns:
+        {"rows": rows rewritten, "before": raw_json bytes before, "after": bytes after}
+    """
+    ensure_db()
+    codec = codec or raw_json_codec()
+    dict_id = train_raw_json_dictionary(codec) if train_dict else _latest_raw_json_dict(codec)
+    target = (codec, dict_id)
+    stats = {"rows": 0, "before": 0, "after": 0}
+    last = ""
+    while True:
+        with _transaction() as cur:
+            cur.execute(
+                "SELECT ad_archive_id, raw_json FROM ads WHERE ad_archive_id > ? AND raw_json IS NOT NULL "
+                "ORDER BY ad_archive_id LIMIT ?",
+                (last, batch),
+            )
+            rows = cur.fetchall()
+        if not rows:
+            break
+        last = rows[-1][0]
+        updates = []
+        for ad_id, value in rows:
+            if raw_json_format(value) == target:
+                continue
+            encoded = encode_raw_json(_raw_json_text(value), codec, dict_id)
+            stats["before"] += len(value.encode("utf-8") if isinstance(value, str) else value)
+            stats["after"] += len(encoded)
+            updates.append((encoded, ad_id))
+        if updates:
+            with _transaction(write=True) as cur:
+                cur.executemany("UPDATE ads SET raw_json = ? WHERE ad_archive_id = ?", updates)
+            stats["rows"] += len(updates)
+    if vacuum:
+        _connect().execute("VACUUM")
+    print(f"🗜️ Compacted raw_json of {stats['rows']} ads: {stats['before']:,} -> {stats['after']:,} bytes")
+    return stats
+
+
+def _ad_row_key(ad_id: Any, raw_json: Optional[str]) -> str:
+    """
+    Primary key for the ads table. Ads without an ad_archive_id get a stable
+    content-derived key so they can still be saved (and deduplicated).
+    """
+    if ad_id not in (None, ""):
+        return str(ad_id)
+    return "local-" + hashlib.sha1((raw_json or "").encode("utf-8")).hexdigest()[:16]
+
+
+def _ad_row_values(
+    ad_fields: Dict[str, Any],
+    raw_item: Optional[Dict[str, Any]],
+    codec: Optional[str] = None,
+    dict_id: Optional[int] = None,
+) -> list:
+    """Values for AD_COLUMNS from curated fields + raw item, as db_insert_team stores them."""
+    raw_json = json.dumps(raw_item, ensure_ascii=False) if raw_item is not None else None
+    vals = [ad_fields.get(c) for c in AD_COLUMNS[:-1]] + [encode_raw_json(raw_json, codec, dict_id)]
+    vals[0] = _ad_row_key(vals[0], raw_json)
+    is_active = ad_fields.get("is_active")
+    vals[AD_COLUMNS.index("is_active")] = int(bool(is_active)) if is_active is not None else None
+    return vals
+
+
+# Saving an ad that is already stored refreshes its mutable columns (values the new
+# save doesn't have are kept); the raw item is refreshed too so it agrees with them
+AD_UPSERT_SQL = (
+    f"INSERT INTO ads ({','.join(AD_COLUMNS)}) VALUES ({','.join('?' * len(AD_COLUMNS))}) "
+    "ON CONFLICT (ad_archive_id) DO UPDATE SET "
+    + ", ".join(f"{c} = COALESCE(excluded.{c}, {c})" for c in AD_REFRESH_COLUMNS)
+    # Lets caches of the decoded item tell a refreshed raw_json from the one they hold
+    + ", raw_version = raw_version + (excluded.raw_json IS NOT NULL AND excluded.raw_json IS NOT raw_json)"
+)
+TEAM_ADS_UPSERT_SQL = (
+    "INSERT INTO team_ads (team_id, ad_archive_id, saved_at) VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP)) "
+    "ON CONFLICT (team_id, ad_archive_id) DO NOTHING"
+)
+
+
+def _insert_ad_and_membership(cur: sqlite3.Cursor, team_id: int, vals: list, saved_at: Any = None) -> bool:
+    """
+    Upsert the ad and add it to the team unless it is already there.
+
+    Safe to retry: a repeated save only refreshes AD_REFRESH_COLUMNS and keeps the
+    team's original membership (and its saved_at).
+
+    Returns:
+        True if the team gained the ad, False if it already held it
+    """
+    cur.execute(AD_UPSERT_SQL, vals)
+    cur.execute(TEAM_ADS_UPSERT_SQL, (team_id, vals[0], saved_at))
+    return cur.rowcount > 0
+
+
+def _dedupe_team_ads(cur: sqlite3.Cursor) -> None:
+    """Collapse duplicate saves of an ad to one team into the first one."""
+    cur.execute(
+        "DELETE FROM team_ads WHERE id NOT IN "
+        "(SELECT MIN(id) FROM team_ads GROUP BY team_id, ad_archive_id)"
+    )
+    if cur.rowcount:
+        print(f"✅ Removed {cur.rowcount} duplicate saved-ad rows")
+
+
+def _delete_orphan_ads(cur: sqlite3.Cursor) -> None:
+    """Drop ads no team references any more."""
+    cur.execute("DELETE FROM ads WHERE ad_archive_id NOT IN (SELECT ad_archive_id FROM team_ads)")
+
+
+def _migrate_legacy_team_tables(cur: sqlite3.Cursor) -> None:
+    """
+    Move ads saved in the old per-team tables (team1..team3, custom_team_*) into
+    ads/team_ads, then drop those tables and custom_teams.
+    """
+    legacy: List[tuple[str, str]] = [(t, t) for t in TEAM_TABLES]
+    if _table_exists(cur, CUSTOM_TEAMS_TABLE):
+        cur.execute(f"SELECT team_name, table_name, created_at FROM {CUSTOM_TEAMS_TABLE} ORDER BY id")
+        for team_name, table_name, created_at in cur.fetchall():
+            cur.execute(
+                "INSERT OR IGNORE INTO teams (team_name, slug, created_at) VALUES (?, ?, ?)",
+                (team_name, _team_slug(team_name), created_at),
+            )
+            legacy.append((team_name, table_name))
+
+    moved = tables = 0
+    for team_name, table_name in legacy:
+        if not _table_exists(cur, table_name):
+            continue
+        tables += 1
+        cur.execute("SELECT id FROM teams WHERE team_name = ? OR slug = ?", (team_name, _team_slug(team_name)))
+        team_id = cur.fetchone()[0]
+        cur.execute(f"SELECT {','.join(LEGACY_TEAM_TABLE_COLUMNS)} FROM {table_name} ORDER BY id")
+        for row in cur.fetchall():
+            vals = list(row[:-1])
+            vals[0] = _ad_row_key(vals[0], vals[-1])
+            _insert_ad_and_membership(cur, team_id, vals, saved_at=row[-1])
+            moved += 1
+        cur.execute(f"DROP TABLE {table_name}")
+    cur.execute(f"DROP TABLE IF EXISTS {CUSTOM_TEAMS_TABLE}")
+    if tables:
+        print(f"✅ Migrated {moved} saved ads from {tables} legacy team tables")
+
+
+def init_db() -> None:
+    """Create the ads/teams/team_ads schema, seed default teams and run pending migrations."""
+    with _transaction(write=True) as cur:
+        for stmt in SCHEMA_SQL.split(";"):
+            if stmt.strip():
+                cur.execute(stmt)
         for t in TEAM_TABLES:
-            cur.execute(SCHEMA_SQL.format(table_name=t))
-        cur.execute(CUSTOM_TEAMS_SCHEMA_SQL)
-        conn.commit()
+            cur.execute(
+                "INSERT OR IGNORE INTO teams (team_name, slug, is_default) VALUES (?, ?, 1)",
+                (t, _team_slug(t)),
+            )
+        version = cur.execute("PRAGMA user_version").fetchone()[0]
+        if version < 3:
+            _dedupe_team_ads(cur)
+        # Before the steps below: the legacy migration already saves through the upsert
+        cur.execute(TEAM_ADS_UNIQUE_INDEX_SQL)
+        if version < 1:
+            _migrate_legacy_team_tables(cur)
+        if version < 2:
+            # Superseded by idx_team_ads_team_saved (keyset pagination on saved_at, id)
+            cur.execute("DROP INDEX IF EXISTS idx_team_ads_team")
+        if version < 4 and "raw_version" not in {r[1] for r in cur.execute("PRAGMA table_info(ads)")}:
+            cur.execute("ALTER TABLE ads ADD COLUMN raw_version INTEGER NOT NULL DEFAULT 0")
+        if version < DB_SCHEMA_VERSION:
+            cur.execute(f"PRAGMA user_version = {DB_SCHEMA_VERSION}")
+
+
+_db_ready: set = set()
+_db_ready_lock = threading.Lock()
+
+
+def ensure_db() -> None:
+    """Run init_db once per process (per DB_PATH) instead of on every Streamlit rerun."""
+    if DB_PATH in _db_ready:
+        return
+    with _db_ready_lock:
+        if DB_PATH not in _db_ready:
+            init_db()
+            _db_ready.add(DB_PATH)
+
+
+# =============================================================================
+# MEDIA MIRROR (saved ads' creatives/avatars, content-addressed by SHA-256)
+# =============================================================================
+def media_mirror_enabled() -> bool:
+    """Whether saving an ad also mirrors its media (MEDIA_MIRROR_ON_SAVE secret/env var, default off)."""
+    return str(resolve_setting("MEDIA_MIRROR_ON_SAVE", "0")).strip().lower() in ("1", "true", "yes", "on")
+
+
+def media_mirror_dir() -> Path:
+    """Blob store for the current DB_PATH (ads.db -> ads_media/)."""
+    db = Path(DB_PATH)
+    return db.with_name(f"{db.stem}_media")
+
+
+def media_blob_path(sha256: str) -> Path:
+    return media_mirror_dir() / sha256[:2] / sha256
+
+
+def _write_media_blob(data: bytes) -> str:
+    """Store `data` under its SHA-256 (once; identical bytes share one file) and return the digest."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = media_blob_path(digest)
+    if path.exists():
+        return digest
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
     finally:
-        conn.close()
+        tmp.unlink(missing_ok=True)
+    return digest
+
+
+def ad_media_urls(ad_fields: Dict[str, Any], raw_item: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """Remote creative and avatar URLs of an ad, keyed by MEDIA_MIRROR_ROLES."""
+    creative = extract_best_media(raw_item)[1] if raw_item else ad_fields.get("original_image_url")
+    urls = {"creative": creative, "avatar": ad_fields.get("page_profile_picture_url")}
+    return {role: url for role, url in urls.items() if is_fetchable(url)}
+
+
+def mirror_ad_media(ad_archive_id: str, urls: Dict[str, str], timeout: float = MEDIA_MIRROR_TIMEOUT) -> int:
+    """
+    Copy an ad's media into the blob store and record it in ad_media.
+
+    Roles already mirrored from the same URL are skipped; media that can't be fetched
+    within `timeout` is left for the next save.
+
+    Returns:
+        Number of roles newly mirrored
+    """
+    with _transaction() as cur:
+        cur.execute("SELECT role, source_url, sha256 FROM ad_media WHERE ad_archive_id = ?", (ad_archive_id,))
+        done = {role: url for role, url, sha in cur.fetchall() if media_blob_path(sha).exists()}
+    todo = {role: url for role, url in urls.items() if done.get(role) != url}
+    if not todo:
+        return 0
+
+    prefetch_media(todo.values())
+    stored = []
+    for role, url in todo.items():
+        blob = fetch_media(url, timeout=timeout)
+        if blob is None:
+            continue
+        stored.append((role, url, _write_media_blob(blob.data), blob.content_type or None, len(blob.data)))
+    if not stored:
+        return 0
+
+    with _transaction(write=True) as cur:
+        for role, url, digest, content_type, size in stored:
+            cur.execute(
+                "INSERT OR IGNORE INTO media_blobs (sha256, content_type, size) VALUES (?, ?, ?)",
+                (digest, content_type, size),
+            )
+            cur.execute(
+                "INSERT INTO ad_media (ad_archive_id, role, source_url, sha256) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (ad_archive_id, role) DO UPDATE SET source_url = excluded.source_url, sha256 = excluded.sha256",
+                (ad_archive_id, role, url, digest),
+            )
+    return len(stored)
+
+
+def mirrored_media(url: Optional[str]) -> Optional[MediaBlob]:
+    """
+    Bytes of a saved ad's media from the blob store, looked up by its original URL.
+
+    Registered as a media_utils local source, so thumbnails, downloads and ZIPs of saved
+    ads are served from disk and keep working after the CDN URL expires.
+    """
+    if not url:
+        return None
+    try:
+        with _transaction() as cur:
+            row = cur.execute(
+                "SELECT m.sha256, b.content_type FROM ad_media m JOIN media_blobs b ON b.sha256 = m.sha256 "
+                "WHERE m.source_url = ? LIMIT 1",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return MediaBlob(media_blob_path(row[0]).read_bytes(), row[1] or "")
+    except (sqlite3.Error, OSError):
+        return None
+
+
+# Mirroring runs after the save commits, off the Streamlit script thread
+_mirror_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mirror")
+
+
+def _mirror_quietly(ad_archive_id: str, urls: Dict[str, str]) -> None:
+    try:
+        mirror_ad_media(ad_archive_id, urls)
+    except Exception as e:  # noqa: BLE001
+        print(f"⚠️ Media mirror failed for ad {ad_archive_id}: {e}")
+
+
+def prune_media_mirror() -> int:
+    """Delete blobs no saved ad references any more (after removals); returns files removed."""
+    with _transaction(write=True) as cur:
+        cur.execute("SELECT sha256 FROM media_blobs WHERE sha256 NOT IN (SELECT sha256 FROM ad_media)")
+        orphans = [r[0] for r in cur.fetchall()]
+        cur.executemany("DELETE FROM media_blobs WHERE sha256 = ?", [(d,) for d in orphans])
+    removed = 0
+    for digest in orphans:
+        try:
+            media_blob_path(digest).unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+    if removed:
+        print(f"🧹 Removed {removed} unreferenced media blobs")
+    return removed
+
+
+register_local_source(mirrored_media)
 
 
 def create_custom_team(team_name: str) -> str:
     """
-    Create a new custom team table and return the table name.
+    Create a new custom team and return its name.
     
     Args:
         team_name: User-friendly name for the team
         
     Returns:
-        str: The table name created for this team
+        str: The stored team name
         
     Raises:
         ValueError: If team name is invalid or already exists
@@ -387,42 +1642,28 @@ def create_custom_team(team_name: str) -> str:
     
     team_name = team_name.strip()
     
-    # Check for invalid characters in table name
+    # Check for invalid characters in team name
     if not team_name.replace("_", "").replace("-", "").isalnum():
         raise ValueError("Team name can only contain letters, numbers, underscores, and hyphens")
     
-    # Generate table name
-    table_name = f"custom_team_{team_name.lower().replace(' ', '_').replace('-', '_')}"
+    slug = _team_slug(team_name)
     
-    conn = _connect()
-    try:
-        cur = conn.cursor()
-        
+    with _transaction(write=True) as cur:
         # Check if team name already exists
-        cur.execute("SELECT team_name FROM custom_teams WHERE team_name = ?", (team_name,))
+        cur.execute("SELECT team_name FROM teams WHERE team_name = ?", (team_name,))
         if cur.fetchone():
             raise ValueError(f"Team '{team_name}' already exists")
         
-        # Check if table name already exists
-        cur.execute("SELECT table_name FROM custom_teams WHERE table_name = ?", (table_name,))
-        if cur.fetchone():
-            raise ValueError(f"Team table '{table_name}' already exists")
-        
-        # Create the team table
-        cur.execute(SCHEMA_SQL.format(table_name=table_name))
+        # Check if a team with an equivalent name already exists
+        cur.execute("SELECT team_name FROM teams WHERE slug = ?", (slug,))
+        existing = cur.fetchone()
+        if existing:
+            raise ValueError(f"Team '{existing[0]}' already exists")
         
-        # Add entry to custom_teams table
-        cur.execute(
-            "INSERT INTO custom_teams (team_name, table_name) VALUES (?, ?)",
-            (team_name, table_name)
-        )
+        cur.execute("INSERT INTO teams (team_name, slug) VALUES (?, ?)", (team_name, slug))
         
-        conn.commit()
-        print(f"Created custom team '{team_name}' with table '{table_name}'")
-        return table_name
-        
-    finally:
-        conn.close()
+    print(f"Created custom team '{team_name}'")
+    return team_name
 
 
 def get_all_teams() -> list[str]:
@@ -432,51 +1673,32 @@ def get_all_teams() -> list[str]:
     Returns:
         list[str]: List of all team names
     """
-    conn = _connect()
-    try:
-        cur = conn.cursor()
-        
-        # Get custom teams
-        cur.execute("SELECT team_name FROM custom_teams ORDER BY created_at")
-        custom_teams = [row[0] for row in cur.fetchall()]
-        
-        # Combine default teams with custom teams
-        all_teams = TEAM_TABLES + custom_teams
-        return all_teams
-        
-    finally:
-        conn.close()
+    cur = _connect().execute("SELECT team_name FROM teams ORDER BY is_default DESC, id")
+    return [row[0] for row in cur.fetchall()]
+
+
+def _get_team_id(cur: sqlite3.Cursor, team_name: str) -> int:
+    cur.execute("SELECT id FROM teams WHERE team_name = ?", (team_name,))
+    result = cur.fetchone()
+    if not result:
+        raise ValueError(f"Team '{team_name}' not found")
+    return result[0]
 
 
-def get_team_table_name(team_name: str) -> str:
+def get_team_id(team_name: str) -> int:
     """
-    Get the database table name for a given team name.
+    Get the teams.id for a given team name.
     
     Args:
         team_name: The team name (can be default or custom)
         
     Returns:
-        str: The database table name
+        int: The team id
         
     Raises:
         ValueError: If team doesn't exist
     """
-    # Check if it's a default team
-    if team_name in TEAM_TABLES:
-        return team_name
-    
-    # Check if it's a custom team
-    conn = _connect()
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT table_name FROM custom_teams WHERE team_name = ?", (team_name,))
-        result = cur.fetchone()
-        if result:
-            return result[0]
-        else:
-            raise ValueError(f"Team '{team_name}' not found")
-    finally:
-        conn.close()
+    return _get_team_id(_connect().cursor(), team_name)
 
 
 def is_valid_team_name(team_name: str) -> bool:
@@ -512,7 +1734,7 @@ def is_valid_team_name(team_name: str) -> bool:
 
 def delete_custom_team(team_name: str) -> bool:
     """
-    Delete a custom team and its associated table.
+    Delete a custom team and its saved ads.
     
     Args:
         team_name: The name of the team to delete
@@ -527,33 +1749,23 @@ def delete_custom_team(team_name: str) -> bool:
     if team_name in TEAM_TABLES:
         raise ValueError(f"Cannot delete default team '{team_name}'")
     
-    conn = _connect()
     try:
-        cur = conn.cursor()
-        
-        # Check if team exists
-        cur.execute("SELECT table_name FROM custom_teams WHERE team_name = ?", (team_name,))
-        result = cur.fetchone()
-        if not result:
-            raise ValueError(f"Team '{team_name}' not found")
-        
-        table_name = result[0]
-        
-        # Delete the team table
-        cur.execute(f"DROP TABLE IF EXISTS {table_name}")
+        with _transaction(write=True) as cur:
+            # Check if team exists
+            team_id = _get_team_id(cur, team_name)
         
-        # Remove entry from custom_teams table
-        cur.execute("DELETE FROM custom_teams WHERE team_name = ?", (team_name,))
+            # Remove memberships, then ads no other team holds, then the team itself
+            cur.execute("DELETE FROM team_ads WHERE team_id = ?", (team_id,))
+            _delete_orphan_ads(cur)
+            cur.execute("DELETE FROM teams WHERE id = ?", (team_id,))
+        prune_media_mirror()
         
-        conn.commit()
-        print(f"Successfully deleted team '{team_name}' and table '{table_name}'")
+        print(f"Successfully deleted team '{team_name}'")
         return True
         
     except Exception as e:
         print(f"Error deleting team '{team_name}': {e}")
         return False
-    finally:
-        conn.close()
 
 
 def is_custom_team(team_name: str) -> bool:
@@ -569,76 +1781,113 @@ def is_custom_team(team_name: str) -> bool:
     return team_name not in TEAM_TABLES
 
 
-def db_insert_team(table: str, ad_fields: Dict[str, Any], raw_item: Optional[Dict[str, Any]] = None) -> None:
-    # Get the actual table name (handles both default and custom teams)
-    actual_table = get_team_table_name(table) if table not in TEAM_TABLES else table
-    
-    cols = [
-        "ad_archive_id", "categories", "collation_count", "collation_id",
-        "start_date", "end_date", "entity_type", "is_active",
-        "page_id", "page_name", "cta_text", "cta_type",
-        "link_url", "page_entity_type", "page_profile_picture_url",
-        "page_profile_uri", "state_media_run_label", "total_active_time",
-        "original_image_url", "raw_json",
-    ]
-    vals = [
-        ad_fields.get("ad_archive_id"),
-        ad_fields.get("categories"),
-        ad_fields.get("collation_count"),
-        ad_fields.get("collation_id"),
-        ad_fields.get("start_date"),
-        ad_fields.get("end_date"),
-        ad_fields.get("entity_type"),
-        int(bool(ad_fields.get("is_active"))) if ad_fields.get("is_active") is not None else None,
-        ad_fields.get("page_id"),
-        ad_fields.get("page_name"),
-        ad_fields.get("cta_text"),
-        ad_fields.get("cta_type"),
-        ad_fields.get("link_url"),
-        ad_fields.get("page_entity_type"),
-        ad_fields.get("page_profile_picture_url"),
-        ad_fields.get("page_profile_uri"),
-        ad_fields.get("state_media_run_label"),
-        ad_fields.get("total_active_time"),
-        ad_fields.get("original_image_url"),
-        json.dumps(raw_item, ensure_ascii=False) if raw_item is not None else None,
-    ]
-    ph = ",".join(["?"] * len(cols))
-    sql = f"INSERT INTO {actual_table} ({','.join(cols)}) VALUES ({ph})"
-    conn = _connect()
-    try:
-        conn.execute(sql, vals)
-        conn.commit()
-    finally:
-        conn.close()
+def db_insert_team(
+    table: str,
+    ad_fields: Dict[str, Any],
+    raw_item: Optional[Dict[str, Any]] = None,
+    mirror_media: Optional[bool] = None,
+) -> bool:
+    """
+    Save an ad to a team: the ad row is stored once, the team gets a membership row.
+
+    Idempotent: saving an ad the team already holds only refreshes its mutable fields
+    (AD_REFRESH_COLUMNS), so double clicks and retries never create duplicates.
+    With mirror_media (default: media_mirror_enabled()) the ad's creative and avatar are
+    then copied into the local blob store in the background, so saved views don't
+    depend on the CDN.
+    """
+    vals = _ad_row_values(ad_fields, raw_item)
+    with _transaction(write=True) as cur:
+        team_id = _get_team_id(cur, table)
+        added = _insert_ad_and_membership(cur, team_id, vals)
+    if mirror_media is None:
+        mirror_media = media_mirror_enabled()
+    if mirror_media:
+        # After the commit and off this thread: downloads never hold the write lock or delay the save
+        urls = ad_media_urls(ad_fields, raw_item)
+        if urls:
+            _mirror_executor.submit(_mirror_quietly, vals[0], urls)
+    return added
+
+
+def db_insert_team_bulk(
+    table: str,
+    ads: Iterable[tuple],
+    mirror_media: Optional[bool] = None,
+) -> Dict[str, int]:
+    """
+    Save many ads to a team in one write transaction (two executemany upserts).
+
+    Same semantics as db_insert_team for each ad; an ad listed twice is saved once.
+    Media mirroring, when enabled, is queued in the background after the commit.
+
+    Args:
+        table: Team name
+        ads: (ad_fields, raw_item) pairs
+        mirror_media: Default media_mirror_enabled()
+
+    Returns:
+        {"inserted": ads the team gained, "updated": ads it already held (refreshed)}
+
+    Raises:
+        ValueError: If the team doesn't exist
+    """
+    codec = raw_json_codec()
+    dict_id = _latest_raw_json_dict(codec)
+    rows: Dict[str, list] = {}
+    media: Dict[str, Dict[str, str]] = {}
+    for ad_fields, raw_item in ads:
+        vals = _ad_row_values(ad_fields, raw_item, codec, dict_id)
+        rows[vals[0]] = vals
+        media[vals[0]] = ad_media_urls(ad_fields, raw_item)
+    if not rows:
+        return {"inserted": 0, "updated": 0}
+
+    with _transaction(write=True) as cur:
+        team_id = _get_team_id(cur, table)
+        cur.executemany(AD_UPSERT_SQL, list(rows.values()))
+        cur.executemany(TEAM_ADS_UPSERT_SQL, [(team_id, key, None) for key in rows])
+        inserted = cur.rowcount
+    print(f"✅ Saved {len(rows)} ads to {table}: {inserted} new, {len(rows) - inserted} refreshed")
+
+    if mirror_media is None:
+        mirror_media = media_mirror_enabled()
+    if mirror_media:
+        for key, urls in media.items():
+            if urls:
+                _mirror_executor.submit(_mirror_quietly, key, urls)
+    return {"inserted": inserted, "updated": len(rows) - inserted}
+
+
+# Saved-ad rows keep the shape of the old per-team tables (membership id + saved_at)
+TEAM_ADS_SELECT_SQL = (
+    "SELECT ta.id AS id, "
+    + ", ".join(f"a.{c} AS {c}" for c in AD_COLUMNS)
+    + ", a.raw_version AS raw_version, ta.saved_at AS saved_at"
+    " FROM team_ads ta JOIN ads a ON a.ad_archive_id = ta.ad_archive_id"
+)
 
 
 def db_fetch_team(table: str) -> List[Dict[str, Any]]:
-    # Get the actual table name (handles both default and custom teams)
-    actual_table = get_team_table_name(table) if table not in TEAM_TABLES else table
-    
     try:
-        conn = _connect()
-        cursor = conn.cursor()
+        with _transaction() as cursor:
+            cursor.execute("SELECT id FROM teams WHERE team_name = ?", (table,))
+            team = cursor.fetchone()
+            if not team:
+                return []
         
-        # Check if table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (actual_table,))
-        if not cursor.fetchone():
-            return []
+            # Fetch all rows
+            cursor.execute(f"{TEAM_ADS_SELECT_SQL} WHERE ta.team_id = ? ORDER BY ta.id", (team[0],))
+            rows = cursor.fetchall()
         
-        # Fetch all rows
-        cursor.execute(f"SELECT * FROM {actual_table}")
-        rows = cursor.fetchall()
-        
-        # Get column names
-        columns = [description[0] for description in cursor.description]
+            # Get column names
+            columns = [description[0] for description in cursor.description]
         
         # Convert to list of dicts
         results: List[Dict[str, Any]] = []
         for row in rows:
             results.append(dict(zip(columns, row)))
         
-        conn.close()
         return results
         
     except Exception as e:
@@ -646,76 +1895,274 @@ def db_fetch_team(table: str) -> List[Dict[str, Any]]:
         return []
 
 
+# Light projection for the saved-ads card grid (everything but raw_json)
+CARD_COLUMNS = [c for c in AD_COLUMNS if c != "raw_json"]
+
+# Saved ads per page in the Saved Ads view
+SAVED_ADS_PAGE_SIZE = 30
+
+
+def db_fetch_team_page(
+    table: str,
+    *,
+    after: Optional[tuple] = None,
+    before: Optional[tuple] = None,
+    limit: int = SAVED_ADS_PAGE_SIZE,
+) -> Dict[str, Any]:
+    """
+    Fetch one page of a team's saved ads, oldest first, without raw_json.
+
+    Keyset pagination on (saved_at, id) over idx_team_ads_team_saved, so any page
+    costs the same regardless of how many ads the team holds.
+
+    Args:
+        table: Team name
+        after: (saved_at, id) of the last row of the previous page -> next page
+        before: (saved_at, id) of the first row of the current page -> previous page
+        limit: Page size
+
+    Returns:
+        {"rows": [...], "next": key or None, "prev": key or None}; pass "next" as
+        `after` or "prev" as `before` to move between pages.
+    """
+    cols = (
+        "ta.id AS id, " + ", ".join(f"a.{c} AS {c}" for c in CARD_COLUMNS)
+        + ", a.raw_version AS raw_version, ta.saved_at AS saved_at"
+    )
+    sql = f"SELECT {cols} FROM team_ads ta JOIN ads a ON a.ad_archive_id = ta.ad_archive_id WHERE ta.team_id = ?"
+    params: list = []
+    if before is not None:
+        sql += " AND (ta.saved_at, ta.id) < (?, ?) ORDER BY ta.saved_at DESC, ta.id DESC"
+        params = list(before)
+    else:
+        if after is not None:
+            sql += " AND (ta.saved_at, ta.id) > (?, ?)"
+            params = list(after)
+        sql += " ORDER BY ta.saved_at, ta.id"
+    sql += " LIMIT ?"
+
+    with _transaction() as cur:
+        team = cur.execute("SELECT id FROM teams WHERE team_name = ?", (table,)).fetchone()
+        if not team:
+            return {"rows": [], "next": None, "prev": None}
+        cur.execute(sql, [team[0], *params, limit + 1])
+        fetched = cur.fetchall()
+        columns = [d[0] for d in cur.description]
+
+    has_more = len(fetched) > limit
+    fetched = fetched[:limit]
+    if before is not None:
+        fetched.reverse()
+    rows = [dict(zip(columns, r)) for r in fetched]
+    if not rows:
+        return {"rows": [], "next": None, "prev": None}
+
+    first = (rows[0]["saved_at"], rows[0]["id"])
+    last = (rows[-1]["saved_at"], rows[-1]["id"])
+    if before is not None:
+        return {"rows": rows, "next": last, "prev": first if has_more else None}
+    return {"rows": rows, "next": last if has_more else None, "prev": first if after is not None else None}
+
+
+def db_fetch_ad(ad_archive_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch one saved ad with every column, including raw_json (for the detail view)."""
+    cur = _connect().execute(
+        f"SELECT {','.join(AD_COLUMNS)}, raw_version FROM ads WHERE ad_archive_id = ?", (str(ad_archive_id),)
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return dict(zip(AD_COLUMNS + ["raw_version"], row))
+
+
+# Ids per query when loading raw_json for many ads (below SQLite's host-parameter limit)
+RAW_JSON_FETCH_CHUNK = 500
+
+
+def db_fetch_raw_json(ad_ids: List[str]) -> Dict[str, Any]:
+    """(stored raw_json undecoded, raw_version) for the given ads, keyed by ad_archive_id; ads without one are left out."""
+    ids = list(dict.fromkeys(str(i) for i in ad_ids if i))
+    out: Dict[str, Any] = {}
+    with _transaction() as cur:
+        for i in range(0, len(ids), RAW_JSON_FETCH_CHUNK):
+            chunk = ids[i:i + RAW_JSON_FETCH_CHUNK]
+            cur.execute(
+                f"SELECT ad_archive_id, raw_json, raw_version FROM ads WHERE raw_json IS NOT NULL "
+                f"AND ad_archive_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            out.update((ad_id, (raw_json, version)) for ad_id, raw_json, version in cur.fetchall())
+    return out
+
+
 def db_delete_ad(team: str, ad: dict) -> bool:
-    """Delete an ad from the specified team table by ad_archive_id. Returns True if successful."""
+    """Remove an ad from the specified team by ad_archive_id. Returns True if successful."""
     try:
-        # Get the actual table name (handles both default and custom teams)
-        table = get_team_table_name(team) if team not in TEAM_TABLES else team
-        
         # Get the ad_archive_id from the ad data
         ad_id = ad.get("ad_archive_id")
         if not ad_id:
             print(f"No ad_archive_id found for deletion")
             return False
         
-        print(f"Attempting to delete ad with ID: {ad_id} from table: {table}")
+        print(f"Attempting to delete ad with ID: {ad_id} from team: {team}")
         
-        conn = _connect()
-        with conn:
-            # Only look for ad_archive_id since that's what's stored in the database
-            cursor = conn.execute(f"DELETE FROM {table} WHERE ad_archive_id = ?", (ad_id,))
+        with _transaction(write=True) as cur:
+            team_id = _get_team_id(cur, team)
+            cursor = cur.execute(
+                "DELETE FROM team_ads WHERE team_id = ? AND ad_archive_id = ?", (team_id, str(ad_id))
+            )
             # Check if any row was actually deleted
             if cursor.rowcount > 0:
-                print(f"Successfully deleted ad {ad_id} from {table}")
-                conn.commit()  # Ensure changes are committed
-                return True
+                cur.execute(
+                    "DELETE FROM ads WHERE ad_archive_id = ? AND NOT EXISTS "
+                    "(SELECT 1 FROM team_ads WHERE ad_archive_id = ?)",
+                    (str(ad_id), str(ad_id)),
+                )
             else:
-                print(f"No ad found with ID {ad_id} in table {table}")
+                print(f"No ad found with ID {ad_id} in team {team}")
                 return False
+        prune_media_mirror()
+        print(f"Successfully deleted ad {ad_id} from {team}")
+        return True
                 
     except Exception as e:
         print(f"Error deleting ad: {e}")
         return False
 
 
+def _ad_selection_sql(ad_ids: Optional[Iterable[Any]]) -> tuple:
+    """
+    WHERE fragment (and its parameters) restricting team_ads to `ad_ids`; None = no restriction.
+
+    The ids travel as one JSON array, so a selection of any size is one statement.
+    """
+    if ad_ids is None:
+        return "", []
+    return " AND ad_archive_id IN (SELECT value FROM json_each(?))", [json.dumps([str(i) for i in ad_ids])]
+
+
+def db_delete_ads(team: str, ad_ids: Optional[Iterable[Any]] = None) -> int:
+    """
+    Remove many ads from a team in one transaction (ad_ids=None: every ad of the team).
+
+    Returns:
+        Number of ads removed
+
+    Raises:
+        ValueError: If the team doesn't exist
+    """
+    where, params = _ad_selection_sql(ad_ids)
+    with _transaction(write=True) as cur:
+        team_id = _get_team_id(cur, team)
+        cur.execute(f"DELETE FROM team_ads WHERE team_id = ?{where}", [team_id, *params])
+        removed = cur.rowcount
+        if removed:
+            _delete_orphan_ads(cur)
+    if removed:
+        prune_media_mirror()
+    print(f"🗑️ Removed {removed} ads from {team}")
+    return removed
+
+
+def db_copy_ads(source: str, target: str, ad_ids: Optional[Iterable[Any]] = None) -> int:
+    """
+    Add ads of `source` to `target` in one statement (ad_ids=None: every ad of source).
+    Ads the target already holds are left as they are.
+
+    Returns:
+        Number of ads the target gained
+
+    Raises:
+        ValueError: If either team doesn't exist
+    """
+    where, params = _ad_selection_sql(ad_ids)
+    with _transaction(write=True) as cur:
+        source_id, target_id = _get_team_id(cur, source), _get_team_id(cur, target)
+        cur.execute(
+            f"INSERT INTO team_ads (team_id, ad_archive_id) "
+            f"SELECT ?, ad_archive_id FROM team_ads WHERE team_id = ?{where} ORDER BY saved_at, id "
+            f"ON CONFLICT (team_id, ad_archive_id) DO NOTHING",
+            [target_id, source_id, *params],
+        )
+        copied = cur.rowcount
+    print(f"📋 Copied {copied} ads from {source} to {target}")
+    return copied
+
+
+def db_move_ads(source: str, target: str, ad_ids: Optional[Iterable[Any]] = None) -> int:
+    """
+    Move ads from `source` to `target` in one transaction (ad_ids=None: every ad of source).
+
+    Memberships are re-pointed in place, keeping their saved_at; ads the target already
+    holds are just removed from the source.
+
+    Returns:
+        Number of ads taken out of the source
+
+    Raises:
+        ValueError: If either team doesn't exist
+    """
+    where, params = _ad_selection_sql(ad_ids)
+    with _transaction(write=True) as cur:
+        source_id, target_id = _get_team_id(cur, source), _get_team_id(cur, target)
+        if source_id == target_id:
+            return 0
+        cur.execute(
+            f"UPDATE OR IGNORE team_ads SET team_id = ? WHERE team_id = ?{where}",
+            [target_id, source_id, *params],
+        )
+        moved = cur.rowcount
+        cur.execute(f"DELETE FROM team_ads WHERE team_id = ?{where}", [source_id, *params])
+        moved += cur.rowcount
+    print(f"📦 Moved {moved} ads from {source} to {target}")
+    return moved
+
+
 def db_clear_all_teams():
-    conn = _connect()
-    with conn:
-        for table in TEAM_TABLES:
-            conn.execute(f"DELETE FROM {table}")
-    conn.close()
+    with _transaction(write=True) as cur:
+        ph = ",".join(["?"] * len(TEAM_TABLES))
+        cur.execute(
+            f"DELETE FROM team_ads WHERE team_id IN (SELECT id FROM teams WHERE team_name IN ({ph}))",
+            TEAM_TABLES,
+        )
+        _delete_orphan_ads(cur)
+    prune_media_mirror()
+
 
 def test_delete_functionality():
     """Test function to verify delete functionality works"""
     try:
         # Test database connection and table structure
-        conn = _connect()
-        cursor = conn.cursor()
+        cursor = _connect().cursor()
         
-        # Check if team1 table exists and has data
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='team1'")
-        if cursor.fetchone():
-            print("✅ team1 table exists")
+        # Check if team1 exists and has data
+        cursor.execute("SELECT id FROM teams WHERE team_name='team1'")
+        team = cursor.fetchone()
+        if team:
+            print("✅ team1 exists")
             
             # Check table structure
-            cursor.execute("PRAGMA table_info(team1)")
+            cursor.execute("PRAGMA table_info(ads)")
             columns = cursor.fetchall()
             print(f"Table columns: {[col[1] for col in columns]}")
             
-            # Check if there are any ads in the table
-            cursor.execute("SELECT COUNT(*) FROM team1")
+            # Check if there are any ads in the team
+            cursor.execute("SELECT COUNT(*) FROM team_ads WHERE team_id = ?", (team[0],))
             count = cursor.fetchone()[0]
             print(f"Number of ads in team1: {count}")
             
             if count > 0:
                 # Show first few ads
-                cursor.execute("SELECT ad_archive_id, page_name FROM team1 LIMIT 3")
+                cursor.execute(
+                    "SELECT a.ad_archive_id, a.page_name FROM team_ads ta "
+                    "JOIN ads a ON a.ad_archive_id = ta.ad_archive_id WHERE ta.team_id = ? LIMIT 3",
+                    (team[0],),
+                )
                 ads = cursor.fetchall()
                 print(f"Sample ads: {ads}")
         else:
-            print("❌ team1 table does not exist")
+            print("❌ team1 does not exist")
         
-        conn.close()
         return True
     except Exception as e:
         print(f"Test failed: {e}")
@@ -856,11 +2303,187 @@ def test_landing_domain_request_format():
 # =============================================================================
 # EXPORT DF (curated)
 # =============================================================================
-def ads_to_dataframe(items: List[Dict[str, Any]]) -> pd.DataFrame:
+CURATED_COLUMNS = [
+    "ad_archive_id", "categories", "collation_count", "collation_id",
+    "start_date", "end_date", "entity_type", "is_active",
+    "page_id", "page_name", "cta_text", "cta_type",
+    "link_url", "page_entity_type", "page_profile_picture_url",
+    "page_profile_uri", "state_media_run_label", "total_active_time",
+    "original_image_url", "original_picture_url",
+]
+
+IMAGE_URL_KEYS = ("original_image_url", "original_picture_url", "original_picture", "url", "src")
+
+# Date strings the vectorized path can take verbatim (exactly the parse_date_maybe formats);
+# anything else falls back to the scalar _coerce_epoch_or_date
+_TZ_RE = r"(?:Z|[+-](?:[01]\d|2[0-3]):?[0-5]\d)"
+_FAST_DATE_RE = (
+    r"\d{4}-\d{2}-\d{2}"
+    r"(?:"
+    r"T\d{2}:\d{2}:\d{2}(?:\.\d{1,6}" + _TZ_RE + r"|" + _TZ_RE + r")?"
+    r"| \d{2}:\d{2}:\d{2}"
+    r")?"
+)
+
+
+_MAX_FAST_EPOCH = 253402300800  # 10000-01-01T00:00:00Z
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _ads_to_dataframe_rowwise(items: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Reference implementation: one extract_selected_fields call per item."""
     rows = [extract_selected_fields(it) for it in items]
     return pd.DataFrame(rows)
 
 
+def _first_dict(val: Any) -> Optional[dict]:
+    if isinstance(val, list) and val:
+        return val[0] if isinstance(val[0], dict) else None
+    if isinstance(val, dict):
+        return val
+    return None
+
+
+def _coerce_date_column(values: List[Any]) -> List[Any]:
+    """Column-wise equivalent of [_coerce_epoch_or_date(v) for v in values]."""
+    out: List[Any] = [None] * len(values)
+    if not values:
+        return out
+
+    epoch_idx: List[int] = []
+    epochs: List[int] = []
+    strings: Dict[str, List[int]] = {}
+    slow: List[int] = []
+    for i, v in enumerate(values):
+        if v is None or v in ("", 0, "0"):
+            continue
+        t = type(v)
+        if t is int or t is float or (t is str and v.isdigit()):
+            try:
+                e = int(v)
+            except (ValueError, OverflowError):
+                slow.append(i)
+                continue
+            # Only epochs that render as a 4-digit year take the vectorized path
+            if 0 < e < _MAX_FAST_EPOCH:
+                epoch_idx.append(i)
+                epochs.append(e)
+            else:
+                slow.append(i)
+        elif t is str:
+            strings.setdefault(v, []).append(i)
+        else:
+            slow.append(i)
+
+    if epochs:
+        # Epoch seconds -> UTC day number -> ISO date, formatting each distinct day once
+        days = np.asarray(epochs, dtype=np.int64) // 86400
+        uniq, inverse = np.unique(days, return_inverse=True)
+        labels = [date.fromordinal(_EPOCH_ORDINAL + int(d)).isoformat() for d in uniq]
+        for i, k in zip(epoch_idx, inverse.tolist()):
+            out[i] = labels[k]
+
+    if strings:
+        # Validate each distinct string once; accepted strings keep their own calendar day
+        ser = pd.Series(list(strings), dtype=object)
+        fast = ser.str.fullmatch(_FAST_DATE_RE).fillna(False).astype(bool)
+        stamp = ser.str.slice(0, 19).str.replace("T", " ", regex=False)
+        has_time = ser.str.len() > 10
+        day_ok = pd.to_datetime(ser.str.slice(0, 10).where(fast), format="%Y-%m-%d", errors="coerce").notna()
+        time_ok = pd.to_datetime(stamp.where(has_time, stamp + " 00:00:00").where(fast), format="%Y-%m-%d %H:%M:%S", errors="coerce").notna()
+        good = (fast & day_ok & time_ok).tolist()
+        for (v, rows), ok in zip(strings.items(), good):
+            val = v[:10] if ok else _coerce_epoch_or_date(v)
+            for i in rows:
+                out[i] = val
+
+    for i in slow:
+        out[i] = _coerce_epoch_or_date(values[i])
+    return out
+
+
+def _join_categories(val: Any) -> Any:
+    if isinstance(val, (list, tuple)):
+        return ", ".join(str(c) for c in val)
+    return val
+
+
+def ads_to_dataframe(items: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Curated export DataFrame, one row per item (same output as extract_selected_fields per row).
+    
+    Extraction is column-wise: each snapshot is parsed once, dates are converted with
+    vectorized pd.to_datetime, and the image URL is coalesced across candidate keys
+    column-wise. Values the fast paths cannot prove identical fall back to the scalar helpers.
+    """
+    if not items:
+        return pd.DataFrame()
+    try:
+        return _ads_to_dataframe_columnwise(items)
+    except Exception as e:  # noqa: BLE001
+        print(f"Vectorized ads_to_dataframe failed, using row-wise path: {e}")
+        return _ads_to_dataframe_rowwise(items)
+
+
+def _ads_to_dataframe_columnwise(items: List[Dict[str, Any]]) -> pd.DataFrame:
+    snaps = [_get_snapshot_dict(it) for it in items]
+    card0s = [_first_dict(sn.get("cards")) for sn in snaps]
+    pgcat0s = [_first_dict(sn.get("page_categories")) for sn in snaps]
+
+    def col(*keys: str) -> List[Any]:
+        if len(keys) == 1:
+            k = keys[0]
+            return [it.get(k) for it in items]
+        k1, k2 = keys
+        return [it.get(k1) or it.get(k2) for it in items]
+
+    # Image URL: coalesce candidate keys of the first image column-wise
+    images = [sn.get("images") for sn in snaps]
+    first_imgs = [im if isinstance(im, dict) else (im[0] if isinstance(im, (list, tuple)) and im and isinstance(im[0], dict) else {}) for im in images]
+    cand = pd.DataFrame({k: [im.get(k) for im in first_imgs] for k in IMAGE_URL_KEYS}, dtype=object)
+    cand = cand.where(cand.astype(bool))
+    image_url = cand.bfill(axis=1).iloc[:, 0].astype(object)
+    image_url = image_url.where(image_url.notna(), None)
+    # Rows whose first image had no URL but more images (or a non-dict first entry) follow the scalar scan
+    for i in image_url.index[image_url.isna()]:
+        im = images[i]
+        if isinstance(im, (list, tuple)) and len(im) > 0:
+            image_url.iat[i] = get_original_image_url({"snapshot": snaps[i]})
+
+    df = pd.DataFrame({
+        "ad_archive_id": col("ad_archive_id", "adId"),
+        "categories": [_join_categories(it.get("categories")) for it in items],
+        "collation_count": col("collation_count"),
+        "collation_id": col("collation_id"),
+        "start_date": _coerce_date_column(col("start_date", "startDate")),
+        "end_date": _coerce_date_column(col("end_date", "endDate")),
+        "entity_type": col("entity_type"),
+        "is_active": col("is_active"),
+        "page_id": col("page_id", "pageId"),
+        "page_name": col("page_name", "pageName"),
+        "cta_text": [(c.get("cta_text") if c is not None else None) or sn.get("cta_text") for c, sn in zip(card0s, snaps)],
+        "cta_type": [(c.get("cta_type") if c is not None else None) or sn.get("cta_type") for c, sn in zip(card0s, snaps)],
+        "link_url": [sn.get("link_url") or (c.get("link_url") if c is not None else sn.get("link_url")) for c, sn in zip(card0s, snaps)],
+        "page_entity_type": [(p.get("page_entity_type") if p is not None else None) or it.get("page_entity_type") for p, it in zip(pgcat0s, items)],
+        "page_profile_picture_url": [it.get("page_profile_picture_url") or sn.get("page_profile_picture_url") for it, sn in zip(items, snaps)],
+        "page_profile_uri": [it.get("page_profile_uri") or sn.get("page_profile_uri") for it, sn in zip(items, snaps)],
+        "state_media_run_label": col("state_media_run_label"),
+        "total_active_time": col("total_active_time"),
+        "original_image_url": image_url.to_numpy(),
+    }, columns=CURATED_COLUMNS[:-1])
+    df["original_picture_url"] = df["original_image_url"]
+    return df
+
+
+def result_fingerprint(items: List[Dict[str, Any]]) -> str:
+    """Cheap identity for a result set (ids + count), used to key per-result caches."""
+    h = hashlib.sha1(str(len(items)).encode("utf-8"))
+    for it in items:
+        h.update(b"\0")
+        h.update(str(it.get("ad_archive_id") or it.get("adId") or id(it)).encode("utf-8"))
+    return h.hexdigest()
+
+
 # =============================================================================
 # CURATED FIELD EXTRACTION
 # =============================================================================
@@ -893,23 +2516,6 @@ def extract_selected_fields(item: dict) -> dict:
     if not link_url and isinstance(card0, dict):
         link_url = card0.get("link_url")
 
-    # coerce date (epoch OK)
-    def _coerce_epoch_or_date(val):
-        if val in (None, "", 0, "0"):
-            return None
-        try:
-            if isinstance(val, (int, float)) or str(val).isdigit():
-                dt = datetime.fromtimestamp(int(val), tz=timezone.utc)
-                return dt.date().isoformat()
-        except Exception:  # noqa: BLE001
-            pass
-        dt = parse_date_maybe(val)
-        if dt:
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt.date().isoformat()
-        return None
-
     start_date = _coerce_epoch_or_date(item.get("start_date") or item.get("startDate"))
     end_date = _coerce_epoch_or_date(item.get("end_date") or item.get("endDate"))
 
@@ -1078,4 +2684,22 @@ def extract_selected_fields(item: dict) -> dict:
             "state_media_run_label": item.get("state_media_run_label"),
             "total_active_time": item.get("total_active_time"),
             "original_image_url": image_url,
-        }
\ No newline at end of file
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ads.db maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compact = commands.add_parser("compact-raw-json", help="re-encode stored raw_json as compressed BLOBs")
+    compact.add_argument("--db", default=str(DB_PATH), help="database file (default: ads.db next to this file)")
+    compact.add_argument("--codec", choices=RAW_JSON_CODECS, help="default: RAW_JSON_CODEC setting, else zlib")
+    compact.add_argument("--train-dict", action="store_true", help="train a shared dictionary on the stored ads first")
+    compact.add_argument("--no-vacuum", action="store_true", help="skip VACUUM afterwards")
+    args = parser.parse_args()
+
+    if args.codec == "zstd" and _import_zstandard() is None:
+        parser.error("--codec zstd needs the zstandard package")
+    DB_PATH = Path(args.db)
+    compact_raw_json(args.codec, train_dict=args.train_dict, vacuum=not args.no_vacuum)
@@ -9,5 +9,5 @@ from components.global_style import inject_global_css
 from components.siderbar import render_sidebar_saved_mode, _card_save_ui, render_filter_bar
 from components.dbtoItem import _db_row_to_item
 from components.renderSidebarSearch import render_sidebar_search
-from components.renderSavedadspage import render_saved_ads_page
+from components.renderSavedadspage import render_saved_ads_page, render_saved_team_page
 from components.mainSearchPage import render_main_search_page